@@ -1,8 +1,18 @@
 # analyzer.py
 # This module contains functions for local analysis tasks like running pylint and reading files.
 
+import ast
+import builtins
 import subprocess
 
+import perf
+from lint_engine import LintMessage, LintResult
+
+# Names every module can use without binding them.
+MODULE_NAMES = frozenset(dir(builtins)) | {"__file__", "__name__", "__doc__", "__builtins__", "__spec__",
+                                            "__loader__", "__package__", "__path__", "__annotations__",
+                                            "__class__"}
+
 def run_pylint(file_path: str) -> str:
     """
     Runs pylint on a given Python file and returns the output.
@@ -27,7 +37,318 @@ def read_file_content(file_path: str) -> str:
     Safely reads the content of a file.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        with perf.span("file.read") as attrs, open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+            attrs["chars"] = len(content)
+            return content
     except Exception as e:
         return f"Error reading file: {e}"
+
+def syntax_check(source: str) -> LintResult:
+    """
+    Tier 0: compiles the source in-process (a few milliseconds) and reports the first syntax error.
+    """
+    with perf.span("check.syntax", chars=len(source)) as attrs:
+        try:
+            compile(source, "live_code.py", "exec", dont_inherit=True)
+        except SyntaxError as e:
+            attrs["ok"] = False
+            message = LintMessage(e.lineno or 1, max(0, (e.offset or 1) - 1), "syntax-error", "E0001",
+                                  "error", f"{e.msg}")
+            return LintResult(messages=[message])
+        except ValueError as e:  # e.g. null bytes in the source
+            attrs["ok"] = False
+            return LintResult(messages=[LintMessage(1, 0, "syntax-error", "E0001", "error", str(e))])
+        attrs["ok"] = True
+    return LintResult()
+
+
+def fast_check(source: str) -> LintResult:
+    """
+    Runs the cheap tiers in order: the syntax check, then (only if the source
+    compiles) pyflakes-style AST checks for undefined names, unused imports and
+    redefinitions. Returns pylint-style messages so results display like pylint's.
+    """
+    result = syntax_check(source)
+    if not result.is_clean:
+        return result
+    with perf.span("check.ast", chars=len(source)) as attrs:
+        messages = _ScopeChecker(ast.parse(source)).run()
+        attrs["messages"] = len(messages)
+    return LintResult(messages=messages)
+
+
+class _Scope:
+    def __init__(self, node, parent, kind):
+        self.node = node
+        self.parent = parent
+        self.kind = kind  # "module", "class", "function" or "comprehension"
+        self.bindings = set()
+        self.loads = []  # (name, Name node)
+        self.imports = []  # (bound name, import node)
+
+
+class _ScopeChecker(ast.NodeVisitor):
+    """
+    A small subset of pyflakes: collects the names each scope binds and loads,
+    then resolves loads with Python's scoping rules once the whole module is seen
+    (so functions may use globals defined further down).
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.module = _Scope(tree, None, "module")
+        self.scopes = [self.module]
+        self.scope = self.module
+        self.star_import = False
+        # Names used inside string annotations ("Foo", Optional["np.ndarray"]): they
+        # keep imports used, but are not checked for being defined.
+        self.annotation_names = set()
+        self.messages = []
+
+    def run(self) -> list:
+        self.generic_visit(self.tree)
+        self._check_redefinitions(self.tree.body)
+        if not self.star_import:
+            self._check_undefined()
+        self._check_unused_imports()
+        return sorted(self.messages, key=lambda m: (m.line, m.column))
+
+    def _report(self, node, symbol, msg_id, message):
+        severity = "error" if msg_id.startswith("E") else "warning"
+        self.messages.append(LintMessage(node.lineno, node.col_offset, symbol, msg_id, severity, message))
+
+    # --- Collection ---
+
+    def _bind(self, name):
+        self.scope.bindings.add(name)
+
+    def _in_scope(self, node, kind, visit_body):
+        scope = _Scope(node, self.scope, kind)
+        self.scopes.append(scope)
+        outer, self.scope = self.scope, scope
+        try:
+            visit_body()
+        finally:
+            self.scope = outer
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self.scope.loads.append((node.id, node))
+        else:
+            self._bind(node.id)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".")[0]
+            self._bind(name)
+            self.scope.imports.append((name, node))
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            if alias.name == "*":
+                self.star_import = True
+                continue
+            name = alias.asname or alias.name
+            self._bind(name)
+            if node.module != "__future__":
+                self.scope.imports.append((name, node))
+
+    def _visit_annotation(self, node):
+        self.visit(node)
+        for child in ast.walk(node):
+            if isinstance(child, ast.Constant) and isinstance(child.value, str):
+                try:
+                    expression = ast.parse(child.value.strip(), mode="eval")
+                except SyntaxError:
+                    continue  # A plain string, e.g. in Literal["a"].
+                self.annotation_names |= {n.id for n in ast.walk(expression) if isinstance(n, ast.Name)}
+
+    def visit_AnnAssign(self, node):
+        self._visit_annotation(node.annotation)
+        if node.value is not None:
+            self.visit(node.value)
+        self.visit(node.target)
+
+    def visit_Global(self, node):
+        self.module.bindings.update(node.names)
+        self.scope.bindings.update(node.names)
+
+    visit_Nonlocal = visit_Global
+
+    def visit_ExceptHandler(self, node):
+        if node.name:
+            self._bind(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchAs(self, node):
+        if node.name:
+            self._bind(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchStar(self, node):
+        if node.name:
+            self._bind(node.name)
+
+    def visit_MatchMapping(self, node):
+        if node.rest:
+            self._bind(node.rest)
+        self.generic_visit(node)
+
+    def _bind_type_params(self, node):
+        # PEP 695 type parameters; bound leniently in the enclosing scope.
+        for param in getattr(node, "type_params", []):
+            self._bind(param.name)
+
+    def _visit_function(self, node):
+        self._bind(node.name)
+        self._bind_type_params(node)
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self._visit_arguments_outside(node.args)
+        if node.returns:
+            self._visit_annotation(node.returns)
+        self._in_scope(node, "function", lambda: self._visit_function_body(node))
+
+    def _visit_arguments_outside(self, args):
+        """Defaults and annotations are evaluated in the enclosing scope."""
+        for default in args.defaults + [d for d in args.kw_defaults if d is not None]:
+            self.visit(default)
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None and arg.annotation is not None:
+                self._visit_annotation(arg.annotation)
+
+    def _visit_function_body(self, node):
+        args = node.args
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None:
+                self._bind(arg.arg)
+        body = node.body if isinstance(node.body, list) else [node.body]
+        for statement in body:
+            self.visit(statement)
+
+    visit_FunctionDef = visit_AsyncFunctionDef = _visit_function
+
+    def visit_Lambda(self, node):
+        self._visit_arguments_outside(node.args)
+        self._in_scope(node, "function", lambda: self._visit_function_body(node))
+
+    def visit_ClassDef(self, node):
+        self._bind(node.name)
+        self._bind_type_params(node)
+        for child in node.decorator_list + node.bases + node.keywords:
+            self.visit(child)
+
+        def body():
+            for statement in node.body:
+                self.visit(statement)
+            self._check_redefinitions(node.body)
+
+        self._in_scope(node, "class", body)
+
+    def _visit_comprehension(self, node):
+        # The first iterable is evaluated in the enclosing scope.
+        self.visit(node.generators[0].iter)
+
+        def body():
+            for index, generator in enumerate(node.generators):
+                self.visit(generator.target)
+                if index:
+                    self.visit(generator.iter)
+                for condition in generator.ifs:
+                    self.visit(condition)
+            for element in ("elt", "key", "value"):
+                if hasattr(node, element):
+                    self.visit(getattr(node, element))
+
+        self._in_scope(node, "comprehension", body)
+
+    visit_ListComp = visit_SetComp = visit_GeneratorExp = visit_DictComp = _visit_comprehension
+
+    def visit_NamedExpr(self, node):
+        # Walrus targets inside a comprehension bind in the enclosing function or module.
+        scope = self.scope
+        while scope.kind == "comprehension":
+            scope = scope.parent
+        scope.bindings.add(node.target.id)
+        self.visit(node.value)
+
+    # --- Checks ---
+
+    def _resolves(self, name, scope):
+        if name in scope.bindings:
+            return True
+        first = scope
+        scope = scope.parent
+        while scope is not None:
+            # Class bodies are not visible from nested functions, only from
+            # comprehensions directly inside them (lenient to avoid false alarms).
+            if scope.kind != "class" or first.kind == "comprehension":
+                if name in scope.bindings:
+                    return True
+            scope = scope.parent
+        return name in MODULE_NAMES
+
+    def _check_undefined(self):
+        for scope in self.scopes:
+            for name, node in scope.loads:
+                if not self._resolves(name, scope):
+                    self._report(node, "undefined-variable", "E0602", f"Undefined variable '{name}'")
+
+    def _check_unused_imports(self):
+        used = {name for scope in self.scopes for name, _ in scope.loads}
+        used |= self.annotation_names | self._dunder_all()
+        for scope in self.scopes:
+            for name, node in scope.imports:
+                if name not in used:
+                    self._report(node, "unused-import", "W0611", f"Unused import {name}")
+
+    def _dunder_all(self):
+        names = set()
+        for node in self.tree.body:
+            if isinstance(node, ast.Assign) and any(
+                    isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets):
+                if isinstance(node.value, (ast.List, ast.Tuple)):
+                    names |= {e.value for e in node.value.elts
+                              if isinstance(e, ast.Constant) and isinstance(e.value, str)}
+        return names
+
+    def _check_redefinitions(self, body):
+        """
+        Reports a def, class or import at the top of a module or class body that
+        replaces an earlier def, class or import of the same name that was never used.
+        """
+        unused = {}
+        for statement in body:
+            loaded = {n.id for n in ast.walk(statement) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)}
+            for name in loaded:
+                unused.pop(name, None)
+            if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                if any(_decorator_name(d) == "overload" for d in getattr(statement, "decorator_list", [])):
+                    continue
+                names = [statement.name]
+            elif isinstance(statement, (ast.Import, ast.ImportFrom)):
+                names = [a.asname or a.name.split(".")[0] for a in statement.names if a.name != "*"]
+            else:
+                for node in ast.walk(statement):
+                    if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+                        unused.pop(node.id, None)
+                continue
+            for name in names:
+                if name in unused:
+                    first = unused[name]
+                    if isinstance(statement, (ast.Import, ast.ImportFrom)):
+                        self._report(statement, "reimported", "W0404",
+                                     f"Reimport '{name}' (imported line {first})")
+                    else:
+                        self._report(statement, "function-redefined", "E0102",
+                                     f"'{name}' already defined line {first}")
+                unused[name] = statement.lineno
+
+
+def _decorator_name(node):
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return node.id if isinstance(node, ast.Name) else None
@@ -0,0 +1,285 @@
+# batch_analyze.py
+# Headless entry point: analyses a whole project folder without the GUI.
+#
+# Usage: python batch_analyze.py PROJECT_DIR [--output DIR] [--format json|markdown|both]
+#                                [--workers N] [--ai-workers N] [--no-ai] [--force]
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+
+from context_packer import EXPLANATION_BUDGET, SOLUTION_BUDGET, pack_context
+from lint_engine import LintMessage, LintResult, format_messages, lint_in_process
+import prompts
+from watch_pipeline import DEFAULT_IGNORE_GLOBS
+
+DEFAULT_EXCLUDES = DEFAULT_IGNORE_GLOBS + ("build", "dist")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def iter_project_files(root, excludes=DEFAULT_EXCLUDES, skip_dirs=()):
+    """
+    Yields the Python and Markdown files under `root`, skipping excluded directories.
+    """
+    skip_dirs = {os.path.abspath(d) for d in skip_dirs}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if not any(fnmatch.fnmatch(d, pattern) for pattern in excludes)
+            and os.path.abspath(os.path.join(dirpath, d)) not in skip_dirs
+        )
+        for filename in sorted(filenames):
+            if filename.endswith((".py", ".md")):
+                yield os.path.join(dirpath, filename)
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(path, files):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f, indent=1)
+    os.replace(temp_path, path)
+
+
+def find_changed_files(root, paths, manifest, force=False, need_ai=True):
+    """
+    Splits `paths` into changed and unchanged files. Files whose size and mtime
+    match the manifest are not even hashed; the others are hashed and only count
+    as changed if their content hash differs. Entries without complete AI
+    results count as changed when AI analysis is requested. Files that cannot
+    be read are left out of both lists.
+    """
+    changed, unchanged = [], []
+    for path in paths:
+        rel_path = os.path.relpath(path, root)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue  # A broken symlink, or deleted since the folder was walked.
+        entry = manifest.get(rel_path)
+        if entry and need_ai and not entry["result"].get("ai_complete"):
+            entry = None
+        if not force and entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            unchanged.append(rel_path)
+            continue
+        try:
+            sha = file_sha256(path)
+        except OSError:
+            continue
+        if not force and entry and entry["sha256"] == sha:
+            entry["mtime"] = stat.st_mtime
+            unchanged.append(rel_path)
+            continue
+        changed.append((rel_path, sha, stat))
+    return changed, unchanged
+
+
+def read_source(path):
+    """Returns (text, None), or (None, error message) if the file cannot be read as UTF-8."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read(), None
+    except (OSError, UnicodeDecodeError) as e:
+        return None, f"Could not read file: {e}"
+
+
+def _lint_file(job):
+    """Process-pool task: lints one file's source inside a worker that keeps pylint imported."""
+    source, module_name = job
+    try:
+        messages = lint_in_process(source, module_name)
+        return LintResult(messages=messages)
+    except Exception as e:
+        return LintResult(error=f"An unexpected error occurred during pylint analysis: {e}")
+
+
+def _warm_worker():
+    import pylint.lint  # noqa: F401  (import once per worker process)
+
+
+def analyze_project(root, output_dir, workers=None, ai_workers=8, use_ai=True, force=False,
+                    excludes=DEFAULT_EXCLUDES, log=print):
+    """
+    Analyses every changed file under `root` and returns the full result table
+    (fresh results merged with those kept in the manifest) plus run statistics.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+
+    start = time.perf_counter()
+    paths = list(iter_project_files(root, excludes, skip_dirs=[output_dir]))
+    changed, unchanged = find_changed_files(root, paths, manifest, force, need_ai=use_ai)
+    log(f"Found {len(paths)} files: {len(changed)} changed, {len(unchanged)} unchanged.")
+
+    results = {}
+    sources = {}
+    for rel_path, _, _ in changed:
+        source, error = read_source(os.path.join(root, rel_path))
+        if error:
+            # Not linted or sent to the AI, and never complete, so it is retried next run.
+            if rel_path.endswith(".py"):
+                results[rel_path] = {"type": "python", "lint": [], "lint_error": error, "ai_complete": False}
+            else:
+                results[rel_path] = {"type": "markdown", "lint_error": error, "ai_complete": False}
+        else:
+            sources[rel_path] = source
+    python_files = [item for item in changed if item[0].endswith(".py") and item[0] in sources]
+    if python_files:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+            jobs = [(sources[rel], os.path.splitext(os.path.basename(rel))[0]) for rel, _, _ in python_files]
+            lint_results = pool.map(_lint_file, jobs, chunksize=4)
+            for (rel_path, _, _), lint_result in zip(python_files, lint_results):
+                results[rel_path] = {
+                    "type": "python",
+                    "lint": [asdict(m) for m in lint_result.messages],
+                    "lint_error": lint_result.error,
+                }
+    lint_done = time.perf_counter()
+    log(f"Linted {len(python_files)} Python files in {lint_done - start:.2f}s.")
+
+    for rel_path in sources:
+        if rel_path.endswith(".md"):
+            results[rel_path] = {"type": "markdown"}
+
+    if use_ai and sources:
+        _add_ai_results(sources, results, ai_workers)
+    ai_done = time.perf_counter()
+
+    now_files = {}
+    for rel_path in unchanged:
+        now_files[rel_path] = manifest[rel_path]
+    for rel_path, sha, stat in changed:
+        now_files[rel_path] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": sha,
+                               "result": results[rel_path]}
+    save_manifest(manifest_path, now_files)
+
+    elapsed = ai_done - start
+    stats = {
+        "files_total": len(paths),
+        "files_analyzed": len(changed),
+        "files_skipped": len(unchanged),
+        "lint_seconds": round(lint_done - start, 3),
+        "ai_seconds": round(ai_done - lint_done, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "files_per_second": round(len(changed) / elapsed, 2) if elapsed > 0 else None,
+    }
+    return {rel: entry["result"] for rel, entry in sorted(now_files.items())}, stats
+
+
+def _add_ai_results(sources, results, ai_workers):
+    """Asks the AI about every readable changed file; `sources` maps relative path to text."""
+    from gemini_client import is_error_answer, query_many
+
+    jobs = []
+    for rel_path, content in sources.items():
+        result = results[rel_path]
+        if result["type"] == "markdown":
+            jobs.append((rel_path, "task_breakdown", prompts.markdown_task_prompt(content)))
+            continue
+        packed = pack_context(content, EXPLANATION_BUDGET)
+        jobs.append((rel_path, "explanation", prompts.explanation_prompt(packed.text)))
+        if result["lint"]:
+            module_name = os.path.splitext(os.path.basename(rel_path))[0]
+            lint_result = LintResult(messages=[LintMessage(**m) for m in result["lint"]])
+            lint_text = format_messages(lint_result, module_name)
+            packed = pack_context(content, SOLUTION_BUDGET, lines=[m.line for m in lint_result.messages])
+            jobs.append((rel_path, "ai_solution", prompts.lint_solution_prompt(lint_text, packed.text)))
+
+    answers = query_many([prompt for _, _, prompt in jobs], max_workers=ai_workers)
+    for rel_path in sources:
+        results[rel_path]["ai_complete"] = True
+    for (rel_path, field_name, _), answer in zip(jobs, answers):
+        results[rel_path][field_name] = answer
+        if is_error_answer(answer):  # Failures are reported as text; retry them next run.
+            results[rel_path]["ai_complete"] = False
+
+
+def write_json_report(path, results, stats):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"stats": stats, "files": results}, f, indent=2)
+
+
+def write_markdown_report(path, results, stats):
+    lines = ["# Code-Mitra Batch Report", "",
+             f"Analysed {stats['files_analyzed']} of {stats['files_total']} files "
+             f"({stats['files_skipped']} unchanged) in {stats['elapsed_seconds']}s "
+             f"— {stats['files_per_second']} files/s.", ""]
+    for rel_path, result in results.items():
+        lines += [f"## {rel_path}", ""]
+        if result.get("lint_error"):
+            lines += [f"Lint error: {result['lint_error']}", ""]
+        elif result["type"] == "python":
+            if result["lint"]:
+                lines += ["### Pylint", "", "```"]
+                lines += [f"{m['line']}:{m['column']}: {m['msg_id']}: {m['message']} ({m['symbol']})"
+                          for m in result["lint"]]
+                lines += ["```", ""]
+            else:
+                lines += ["No pylint findings.", ""]
+        for field_name, title in (("explanation", "AI Code Explanation"),
+                                  ("ai_solution", "AI Suggested Solution"),
+                                  ("task_breakdown", "Task Breakdown")):
+            if result.get(field_name):
+                lines += [f"### {title}", "", result[field_name], ""]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse a project folder with pylint and Gemini, headlessly.")
+    parser.add_argument("folder", help="Project folder to analyse")
+    parser.add_argument("--output", default="code_mitra_report", help="Directory for reports and the manifest")
+    parser.add_argument("--format", choices=("json", "markdown", "both"), default="both")
+    parser.add_argument("--workers", type=int, default=None, help="Lint processes (default: CPU count)")
+    parser.add_argument("--ai-workers", type=int, default=8, help="Concurrent Gemini requests")
+    parser.add_argument("--no-ai", action="store_true", help="Only run pylint")
+    parser.add_argument("--force", action="store_true", help="Re-analyse files even if unchanged")
+    parser.add_argument("--exclude", action="append", default=[], help="Extra directory glob to skip")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        parser.error(f"Not a folder: {args.folder}")
+
+    results, stats = analyze_project(
+        os.path.abspath(args.folder), args.output, workers=args.workers, ai_workers=args.ai_workers,
+        use_ai=not args.no_ai, force=args.force, excludes=DEFAULT_EXCLUDES + tuple(args.exclude),
+    )
+    if args.format in ("json", "both"):
+        write_json_report(os.path.join(args.output, "report.json"), results, stats)
+    if args.format in ("markdown", "both"):
+        write_markdown_report(os.path.join(args.output, "report.md"), results, stats)
+
+    print(f"Analysed {stats['files_analyzed']} files in {stats['elapsed_seconds']}s "
+          f"({stats['files_per_second']} files/s); {stats['files_skipped']} unchanged files skipped.")
+    print(f"Reports written to {os.path.abspath(args.output)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# benchmarks/bench_lint.py
+# Compares the warm lint engine with the original subprocess-plus-tempfile pylint path.
+#
+# Usage: python benchmarks/bench_lint.py [--runs N] [file.py]
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import run_pylint, read_file_content
+from lint_engine import LintEngine
+
+SAMPLE_CODE = '''
+import os
+import sys
+
+def load(path):
+    with open(path) as f:
+        data = f.read()
+    return data.splitlines()
+
+class Counter:
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, word):
+        self.counts[word] = self.counts.get(word, 0) + 1
+
+def main():
+    counter = Counter()
+    for line in load(sys.argv[1]):
+        for word in line.split():
+            counter.add(word)
+    print(undefined_name)
+'''
+
+
+def subprocess_path(source):
+    with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.py', encoding='utf-8') as temp_file:
+        temp_file.write(source)
+        temp_file_path = temp_file.name
+    try:
+        return run_pylint(temp_file_path)
+    finally:
+        os.remove(temp_file_path)
+
+
+def time_runs(func, source, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(source)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name, timings):
+    print(f"{name:<22} median {statistics.median(timings) * 1000:8.1f} ms   "
+          f"min {min(timings) * 1000:8.1f} ms   max {max(timings) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file", nargs="?", help="Python file to lint (defaults to a built-in sample)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    source = read_file_content(args.file) if args.file else SAMPLE_CODE
+
+    engine = LintEngine()
+    start = time.perf_counter()
+    engine.warm_up()
+    print(f"Engine warm-up (one-off): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    report("subprocess + tempfile", time_runs(subprocess_path, source, args.runs))
+    report("warm lint engine", time_runs(engine.lint_source, source, args.runs))
+    engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/corpus.py
+# Generates deterministic synthetic Python and Markdown inputs of a given size.
+
+import random
+
+CORPUS_SIZES = (10, 100, 1000, 10000, 50000)
+
+_FUNCTION_TEMPLATE = '''def {name}(items, factor={factor}):
+    """Scale and filter the items."""
+    total = 0
+    for item in items:
+        if item % {mod} == 0:
+            total += item * factor
+    unused_{name} = len(items)
+    return total
+'''
+
+_CLASS_TEMPLATE = '''class {name}:
+    def __init__(self, size):
+        self.size = size
+        self.values = list(range(size))
+
+    def mean(self):
+        return sum(self.values) / max(1, self.size)
+
+    def scaled(self, factor):
+        return [value * factor for value in self.values]
+'''
+
+
+def python_source(lines: int, seed: int = 0) -> str:
+    """
+    Returns roughly `lines` lines of valid Python with a realistic mix of
+    functions, classes and some pylint findings (unused variables, missing docstrings).
+    """
+    rng = random.Random(seed)
+    parts = ["import os\nimport sys\n"]
+    count = 2
+    index = 0
+    while count < lines:
+        if rng.random() < 0.3:
+            block = _CLASS_TEMPLATE.format(name=f"Model{index}")
+        else:
+            block = _FUNCTION_TEMPLATE.format(name=f"compute_{index}", factor=rng.randint(1, 9),
+                                              mod=rng.randint(2, 7))
+        parts.append(block)
+        count += block.count("\n") + 1
+        index += 1
+    return "\n".join(parts)
+
+
+def markdown_source(lines: int, seed: int = 0) -> str:
+    """Returns roughly `lines` lines of Markdown task description."""
+    rng = random.Random(seed)
+    out = ["# Project tasks", ""]
+    section = 0
+    while len(out) < lines:
+        section += 1
+        out += [f"## Milestone {section}", "", f"Deliver feature {section} with tests and docs.", ""]
+        for step in range(rng.randint(3, 8)):
+            out.append(f"- [ ] Step {step + 1}: implement part {step + 1} of feature {section}")
+        out.append("")
+    return "\n".join(out[:lines]) + "\n"
@@ -0,0 +1,194 @@
+# benchmarks/fake_gemini_server.py
+# A local stand-in for the Gemini API used by the offline benchmarks.
+#
+# Usage: python benchmarks/fake_gemini_server.py [--port 8765] [--latency 0.2] [--burst-429 3]
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Every answer contains this, sent as raw UTF-8 (the real API does not \u-escape), so
+# a client that decodes the stream with the wrong charset shows up in the benchmark.
+NON_ASCII_SAMPLE = "नमस्ते — café ✓"
+
+
+class FakeGeminiConfig:
+    """
+    latency:      seconds before the first byte of every answer
+    chunk_delay:  seconds between streamed chunks
+    chunks:       number of chunks a streamed answer is split into
+    payload_size: characters in every answer
+    burst_429:    answer this many requests with 429 after every `burst_every` successes
+    retry_after:  Retry-After header sent with 429s (None to omit it)
+    """
+
+    def __init__(self, latency=0.05, chunk_delay=0.01, chunks=8, payload_size=2000,
+                 burst_429=0, burst_every=10, retry_after=0.1):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunks = chunks
+        self.payload_size = payload_size
+        self.burst_429 = burst_429
+        self.burst_every = burst_every
+        self.retry_after = retry_after
+
+
+class FakeGeminiServer:
+    """
+    Mimics generateContent and streamGenerateContent (SSE over chunked transfer
+    encoding, as the real API sends it). Runs in a background thread.
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or FakeGeminiConfig()
+        self.stats = {"requests": 0, "rate_limited": 0, "streamed": 0}
+        self._lock = threading.Lock()
+        self._successes_since_burst = 0
+        self._burst_left = 0
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1beta"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _should_rate_limit(self):
+        with self._lock:
+            self.stats["requests"] += 1
+            config = self.config
+            if not config.burst_429:
+                return False
+            if self._burst_left:
+                self._burst_left -= 1
+                self.stats["rate_limited"] += 1
+                return True
+            self._successes_since_burst += 1
+            if self._successes_since_burst > config.burst_every:
+                self._successes_since_burst = 0
+                self._burst_left = config.burst_429 - 1
+                self.stats["rate_limited"] += 1
+                return True
+            return False
+
+    def _answer(self, prompt):
+        config = self.config
+        seed = f"Answer to a {len(prompt)}-character prompt: {NON_ASCII_SAMPLE}. "
+        text = (seed * (config.payload_size // len(seed) + 1))[:config.payload_size]
+        parts = prompt.count("--- PART [")
+        if parts > 1:
+            # Multi-part prompts get one "### [n]" section per part, like the real model is asked to.
+            size = max(1, len(text) // parts)
+            return "\n".join(f"### [{n}]\n{text[:size]}" for n in range(1, parts + 1))
+        return text
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                try:
+                    prompt = json.loads(body)["contents"][0]["parts"][0]["text"]
+                except (ValueError, KeyError, IndexError):
+                    return self._send_json(400, {"error": {"message": "Malformed request"}})
+
+                if server._should_rate_limit():
+                    headers = {}
+                    if server.config.retry_after is not None:
+                        headers["Retry-After"] = str(server.config.retry_after)
+                    return self._send_json(429, {"error": {"message": "Resource exhausted"}}, headers)
+
+                time.sleep(server.config.latency)
+                answer = server._answer(prompt)
+                if ":streamGenerateContent" in self.path:
+                    self._stream(answer)
+                elif ":generateContent" in self.path:
+                    self._send_json(200, _candidate(answer, prompt))
+                else:
+                    self._send_json(404, {"error": {"message": "Unknown method"}})
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, answer):
+                with server._lock:
+                    server.stats["streamed"] += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                count = max(1, server.config.chunks)
+                size = max(1, len(answer) // count + 1)
+                for i in range(0, len(answer), size):
+                    chunk = json.dumps(_candidate(answer[i:i + size]), ensure_ascii=False)
+                    event = f"data: {chunk}\r\n\r\n".encode("utf-8")
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+                    self.wfile.flush()
+                    time.sleep(server.config.chunk_delay)
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+
+def _candidate(text, prompt=""):
+    payload = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    if prompt:
+        payload["usageMetadata"] = {"promptTokenCount": len(prompt) // 4,
+                                    "candidatesTokenCount": len(text) // 4}
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Gemini API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--payload-size", type=int, default=2000)
+    parser.add_argument("--burst-429", type=int, default=0)
+    parser.add_argument("--burst-every", type=int, default=10)
+    args = parser.parse_args()
+
+    config = FakeGeminiConfig(latency=args.latency, chunk_delay=args.chunk_delay, payload_size=args.payload_size,
+                              burst_429=args.burst_429, burst_every=args.burst_every)
+    server = FakeGeminiServer(config, port=args.port).start()
+    print(f"Fake Gemini API listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
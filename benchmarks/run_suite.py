@@ -0,0 +1,154 @@
+# benchmarks/run_suite.py
+# Runs the offline benchmark suite and compares it with a stored baseline.
+#
+# Usage: python benchmarks/run_suite.py [--quick] [--runs N] [--update-baseline] [--tolerance 0.25]
+#
+# Exits with status 1 when any scenario's p95 latency is more than `tolerance`
+# slower than the baseline, or its throughput is more than `tolerance` lower.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CORPUS_SIZES, markdown_source, python_source
+from fake_gemini_server import NON_ASCII_SAMPLE, FakeGeminiConfig, FakeGeminiServer
+from headless import HeadlessDriver
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "results.json")
+QUICK_SIZES = (10, 1000)
+
+RUN_CODE = "total = 0\nfor i in range(100000):\n    total += i\nprint(total)\n"
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(timings):
+    """Latency distribution (ms) and throughput (runs/s) for one scenario."""
+    totals = sorted(total for total, _ in timings)
+    firsts = sorted(first for _, first in timings)
+    return {
+        "runs": len(totals),
+        "p50_ms": round(_percentile(totals, 0.50) * 1000, 1),
+        "p95_ms": round(_percentile(totals, 0.95) * 1000, 1),
+        "max_ms": round(totals[-1] * 1000, 1),
+        "first_output_p50_ms": round(statistics.median(firsts) * 1000, 1),
+        "throughput_per_s": round(len(totals) / sum(totals), 2) if sum(totals) else None,
+    }
+
+
+def run_scenarios(driver, sizes, runs, workdir):
+    results = {}
+
+    def measure(name, func):
+        func()  # Warm-up run, not recorded.
+        results[name] = summarize([func() for _ in range(runs)])
+        row = results[name]
+        print(f"{name:<28} p50 {row['p50_ms']:>9} ms   p95 {row['p95_ms']:>9} ms   "
+              f"first output {row['first_output_p50_ms']:>9} ms   {row['throughput_per_s']} runs/s")
+
+    for size in sizes:
+        for kind, generate, suffix in (("python", python_source, ".py"), ("markdown", markdown_source, ".md")):
+            path = os.path.join(workdir, f"{kind}_{size}{suffix}")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(generate(size))
+            measure(f"analyze.{kind}.{size}", lambda path=path: driver.analyze_file(path))
+
+    code = python_source(100)
+    measure("question.generate", lambda: driver.ask_question("Write a function that reverses a list."))
+    measure("question.about_code", lambda: driver.ask_question("What does compute_1 do?", code))
+    # The streamed answer must survive decoding intact, not just arrive quickly.
+    if NON_ASCII_SAMPLE not in driver.gui.displays.get("answer", ""):
+        raise RuntimeError("Streamed answer was garbled: non-ASCII text did not survive decoding.")
+    measure("execute.loop", lambda: driver.execute_code(RUN_CODE))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of human-readable regressions against the baseline scenarios."""
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms vs baseline {base['p95_ms']} ms")
+        if base.get("throughput_per_s") and current["throughput_per_s"] is not None \
+                and current["throughput_per_s"] < base["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput_per_s']}/s "
+                               f"vs baseline {base['throughput_per_s']}/s")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline Code-Mitra benchmark suite.")
+    parser.add_argument("--quick", action="store_true", help=f"Only corpus sizes {QUICK_SIZES}")
+    parser.add_argument("--runs", type=int, default=5, help="Recorded runs per scenario")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server latency in seconds")
+    parser.add_argument("--burst-429", type=int, default=0, help="429 responses per burst from the fake server")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--output", default=DEFAULT_RESULTS)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed fractional slowdown before a scenario counts as a regression")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else CORPUS_SIZES
+    config = FakeGeminiConfig(latency=args.latency, burst_429=args.burst_429)
+    with FakeGeminiServer(config) as server, tempfile.TemporaryDirectory() as workdir:
+        driver = HeadlessDriver(server.base_url)
+        try:
+            start = time.perf_counter()
+            results = run_scenarios(driver, sizes, args.runs, workdir)
+            elapsed = time.perf_counter() - start
+        finally:
+            driver.close()
+        server_stats = dict(server.stats)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+        "settings": {"runs": args.runs, "latency": args.latency, "burst_429": args.burst_429,
+                     "sizes": list(sizes)},
+        "server": server_stats,
+        "elapsed_s": round(elapsed, 1),
+        "scenarios": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output} ({elapsed:.1f}s, {server_stats['requests']} API requests).")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --update-baseline to create one on this machine.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"No regressions beyond {args.tolerance:.0%} of the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# cancellation.py
+# This module provides the cancellation token shared by the scheduler, the Gemini client and the lint engine.
+
+import threading
+
+
+class Cancelled(Exception):
+    """Raised inside a job when its token has been cancelled."""
+
+
+class CancelToken:
+    """
+    A thread-safe cancellation flag. Long-running operations register a
+    callback (e.g. killing a process) that fires when the token is cancelled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cancellation callback failed: {e}")
+
+    def add_callback(self, callback):
+        """
+        Registers a callback to run on cancellation and returns a function that
+        unregisters it. The callback runs immediately if already cancelled.
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+
+                def remove():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return remove
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self):
+        if self._cancelled:
+            raise Cancelled()
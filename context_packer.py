@@ -0,0 +1,193 @@
+# context_packer.py
+# This module shrinks large source files to the code spans a prompt actually needs.
+
+import ast
+import re
+from dataclasses import dataclass
+
+import perf
+from prompts import estimate_tokens
+
+EXPLANATION_BUDGET = 8000
+SOLUTION_BUDGET = 4000
+QUESTION_BUDGET = 4000
+# Lines kept around a reported line that is not inside any function or class.
+MODULE_LEVEL_WINDOW = 3
+
+
+@dataclass
+class PackedContext:
+    text: str
+    tokens: int
+    original_tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+
+def _definitions(tree):
+    """
+    Yields (node, qualified name) for every function and class, including methods
+    and nested definitions.
+    """
+    stack = [(node, "") for node in tree.body]
+    while stack:
+        node, prefix = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            name = f"{prefix}{node.name}"
+            yield node, name
+            stack.extend((child, f"{name}.") for child in node.body)
+
+
+def _span(node):
+    start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+    return start, node.end_lineno
+
+
+def _signature(node, indent=""):
+    if isinstance(node, ast.ClassDef):
+        bases = ", ".join(ast.unparse(base) for base in node.bases)
+        header = f"{indent}class {node.name}({bases}):" if bases else f"{indent}class {node.name}:"
+        methods = [child for child in node.body if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        if not methods:
+            return f"{header} ..."
+        return "\n".join([header] + [_signature(method, indent + "    ") for method in methods])
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+    return f"{indent}{prefix} {node.name}({ast.unparse(node.args)}){returns}: ..."
+
+
+def outline(tree) -> str:
+    """
+    A compact view of the module: imports, top-level names and definition signatures.
+    """
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.unparse(node))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            lines.append(f"# line {node.lineno}\n{_signature(node)}")
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            lines.append(f"{', '.join(ast.unparse(t) for t in targets)} = ...")
+    return "\n".join(lines)
+
+
+def symbols_in_question(question: str, source: str) -> list:
+    """
+    Returns the identifiers mentioned in a question that are defined in the source.
+    """
+    words = set(re.findall(r"[A-Za-z_][A-Za-z0-9_]*", question))
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+    return [name for _, name in _definitions(tree) if name.rsplit(".", 1)[-1] in words]
+
+
+def pack_context(source: str, budget_tokens: int, lines=(), symbols=()) -> PackedContext:
+    """
+    Fits `source` into `budget_tokens`. Small sources are returned unchanged.
+    Otherwise the innermost functions or classes enclosing `lines`, and the
+    definitions named in `symbols`, are included verbatim (most-referenced first)
+    together with an outline of the rest of the module. Without any targets,
+    definitions are taken in file order.
+    """
+    with perf.span("context.pack") as attrs:
+        packed = _pack_context(source, budget_tokens, lines, symbols)
+        attrs.update(tokens=packed.tokens, tokens_saved=packed.tokens_saved)
+    return packed
+
+
+def _pack_context(source, budget_tokens, lines, symbols):
+    original_tokens = estimate_tokens(source)
+    if original_tokens <= budget_tokens:
+        return PackedContext(source, original_tokens, original_tokens)
+
+    source_lines = source.splitlines()
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return _pack_windows(source_lines, budget_tokens, lines, original_tokens)
+
+    definitions = list(_definitions(tree))
+    scores = {}
+    for line in lines:
+        enclosing = [
+            (node, name) for node, name in definitions
+            if _span(node)[0] <= line <= _span(node)[1]
+        ]
+        if enclosing:
+            # Innermost = the one with the smallest span.
+            node, _ = min(enclosing, key=lambda item: _span(item[0])[1] - _span(item[0])[0])
+            key = _span(node)
+        else:
+            key = (max(1, line - MODULE_LEVEL_WINDOW), min(len(source_lines), line + MODULE_LEVEL_WINDOW))
+        scores[key] = scores.get(key, 0) + 1
+    wanted = set(symbols)
+    for node, name in definitions:
+        if name in wanted or name.rsplit(".", 1)[-1] in wanted:
+            scores[_span(node)] = scores.get(_span(node), 0) + len(lines) + 1
+    if not scores:
+        scores = {_span(node): 0 for node in tree.body
+                  if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))}
+        ordered = sorted(scores)
+    else:
+        ordered = sorted(scores, key=lambda span: (-scores[span], span))
+
+    module_outline = outline(tree)
+    header = "# --- Module outline (bodies omitted) ---\n"
+    remaining = budget_tokens - estimate_tokens(header + module_outline)
+    if remaining < budget_tokens // 2:
+        # A huge outline must not crowd out the code the prompt is about.
+        module_outline = _truncate(module_outline, budget_tokens // 4)
+        remaining = budget_tokens - estimate_tokens(header + module_outline)
+
+    chosen = []
+    for start, end in ordered:
+        if any(s <= start and end <= e for s, e, _ in chosen):
+            continue
+        snippet = _format_span(source_lines, start, end)
+        cost = estimate_tokens(snippet)
+        if cost > remaining:
+            if not chosen:
+                chosen.append((start, end, _truncate(snippet, remaining)))
+                remaining = 0
+            continue
+        chosen.append((start, end, snippet))
+        remaining -= cost
+
+    parts = [header + module_outline, "# --- Relevant code ---"]
+    parts += [snippet for _, _, snippet in sorted(chosen)]
+    text = "\n\n".join(parts)
+    return PackedContext(text, estimate_tokens(text), original_tokens)
+
+
+def _format_span(source_lines, start, end):
+    return f"# lines {start}-{end}\n" + "\n".join(source_lines[start - 1:end])
+
+
+def _truncate(text, budget_tokens):
+    limit = max(0, budget_tokens) * 4
+    if len(text) <= limit:
+        return text
+    return text[:limit] + "\n# ... (truncated)"
+
+
+def _pack_windows(source_lines, budget_tokens, lines, original_tokens):
+    """Fallback for code that does not parse: keep windows of lines around the targets."""
+    if not lines:
+        text = _truncate("\n".join(source_lines), budget_tokens)
+        return PackedContext(text, estimate_tokens(text), original_tokens)
+    parts, remaining = [], budget_tokens
+    for line in sorted(set(lines)):
+        start = max(1, line - MODULE_LEVEL_WINDOW * 3)
+        end = min(len(source_lines), line + MODULE_LEVEL_WINDOW * 3)
+        snippet = _format_span(source_lines, start, end)
+        if estimate_tokens(snippet) > remaining:
+            break
+        parts.append(snippet)
+        remaining -= estimate_tokens(snippet)
+    text = "\n\n".join(parts)
+    return PackedContext(text, estimate_tokens(text), original_tokens)
@@ -0,0 +1,196 @@
+# execution_pool.py
+# This module runs user code in pre-started, resource-limited interpreter processes.
+
+import codecs
+import json
+import queue
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+import perf
+
+DEFAULT_PRELOAD = ("collections", "itertools", "functools", "math", "random", "re", "json",
+                   "datetime", "statistics", "string", "typing", "dataclasses")
+DEFAULT_CPU_SECONDS = 10
+DEFAULT_MEMORY_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_OUTPUT = 1024 * 1024
+DEFAULT_WALL_TIMEOUT = 10
+
+# Runs inside each worker: import the common modules up front, then block until
+# one job arrives on stdin, apply the resource limits and execute it as __main__.
+# Tracebacks leave out this harness's own frames (compiled as "<string>").
+WORKER_SOURCE = r'''
+import importlib, json, os, sys, traceback
+def _excepthook(kind, value, tb):
+    while tb is not None and tb.tb_frame.f_code.co_filename == "<string>":
+        tb = tb.tb_next
+    sys.stderr.write("".join(traceback.format_exception(kind, value, tb)))  # One write, one chunk.
+sys.excepthook = _excepthook
+for _name in sys.argv[1].split(","):
+    if _name:
+        try:
+            importlib.import_module(_name)
+        except ImportError:
+            pass
+_job = json.loads(sys.stdin.readline())
+try:
+    import resource
+    if _job["cpu_seconds"]:
+        resource.setrlimit(resource.RLIMIT_CPU, (_job["cpu_seconds"], _job["cpu_seconds"] + 1))
+    if _job["memory_bytes"]:
+        resource.setrlimit(resource.RLIMIT_AS, (_job["memory_bytes"], _job["memory_bytes"]))
+except (ImportError, ValueError, OSError):
+    pass
+sys.stdin.close()
+sys.stdin = open(os.devnull)
+sys.argv = ["<live code>"]
+_globals = {"__name__": "__main__", "__builtins__": __builtins__}
+exec(compile(_job["code"], "<live code>", "exec"), _globals)
+'''
+
+
+@dataclass
+class ExecutionResult:
+    returncode: int = None
+    duration: float = 0.0
+    timed_out: bool = False
+    cancelled: bool = False
+    truncated: bool = False
+
+    def summary(self) -> str:
+        if self.cancelled:
+            return "Execution cancelled."
+        if self.timed_out:
+            return f"Execution timed out after {self.duration:.0f} seconds."
+        if self.truncated:
+            return "Execution stopped: output limit exceeded."
+        return f"Finished with exit code {self.returncode} in {self.duration:.2f}s."
+
+
+class ExecutionPool:
+    """
+    Keeps `size` interpreters started and idle with common modules already
+    imported, so a run only pays for sending the code. Each interpreter runs
+    exactly one job and is then replaced in the background, which keeps runs
+    isolated from each other.
+    """
+
+    def __init__(self, size=1, preload=DEFAULT_PRELOAD, cpu_seconds=DEFAULT_CPU_SECONDS,
+                 memory_bytes=DEFAULT_MEMORY_BYTES, max_output=DEFAULT_MAX_OUTPUT,
+                 wall_timeout=DEFAULT_WALL_TIMEOUT, python=None):
+        self.size = size
+        self.preload = tuple(preload)
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.max_output = max_output
+        self.wall_timeout = wall_timeout
+        # Use the interpreter running Code-Mitra, not whichever `python` is first on PATH.
+        self.python = python or sys.executable
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _spawn(self):
+        return subprocess.Popen(
+            [self.python, "-u", "-c", WORKER_SOURCE, ",".join(self.preload)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+
+    def warm_up(self):
+        """Fills the pool up to its size; call from a background thread."""
+        with self._lock:
+            missing = 0 if self._closed else self.size - self._ready.qsize()
+        for _ in range(missing):
+            self._ready.put(self._spawn())
+
+    def _take_worker(self):
+        while True:
+            try:
+                process = self._ready.get_nowait()
+            except queue.Empty:
+                return self._spawn()
+            if process.poll() is None:
+                return process
+
+    def run(self, code: str, on_output, cancel_token=None) -> ExecutionResult:
+        """
+        Runs `code` and streams its output through on_output(stream_name, text)
+        as it is produced. Blocks until the run ends, is cancelled or hits a limit.
+        """
+        with perf.span("execute", code_bytes=len(code)) as attrs:
+            result = self._run(code, on_output, cancel_token)
+            attrs.update(returncode=result.returncode, timed_out=result.timed_out, cancelled=result.cancelled)
+        return result
+
+    def _run(self, code, on_output, cancel_token):
+        process = self._take_worker()
+        threading.Thread(target=self.warm_up, daemon=True).start()
+
+        result = ExecutionResult()
+        output_bytes = [0]
+        start = time.perf_counter()
+
+        def kill(reason=None):
+            if reason:
+                setattr(result, reason, True)
+            if process.poll() is None:
+                process.kill()
+
+        def pump(pipe, stream_name):
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            while True:
+                data = pipe.read1(65536) if hasattr(pipe, "read1") else pipe.read(4096)
+                if not data:
+                    break
+                output_bytes[0] += len(data)
+                if output_bytes[0] > self.max_output:
+                    kill("truncated")
+                    break
+                text = decoder.decode(data)
+                if text:
+                    on_output(stream_name, text)
+            pipe.close()
+
+        readers = [
+            threading.Thread(target=pump, args=(process.stdout, "stdout"), daemon=True),
+            threading.Thread(target=pump, args=(process.stderr, "stderr"), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+
+        remove_callback = cancel_token.add_callback(lambda: kill("cancelled")) if cancel_token else None
+        try:
+            job = {"code": code, "cpu_seconds": self.cpu_seconds, "memory_bytes": self.memory_bytes}
+            try:
+                process.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+                process.stdin.close()
+            except OSError:
+                pass  # The worker died; its stderr explains why.
+            try:
+                process.wait(timeout=self.wall_timeout)
+            except subprocess.TimeoutExpired:
+                kill("timed_out")
+                process.wait()
+        finally:
+            if remove_callback:
+                remove_callback()
+        for reader in readers:
+            reader.join()
+
+        result.returncode = process.returncode
+        result.duration = time.perf_counter() - start
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                process = self._ready.get_nowait()
+            except queue.Empty:
+                break
+            process.kill()
+            process.wait()
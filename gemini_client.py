@@ -1,57 +1,400 @@
 # gemini_client.py
 # This module handles all communication with the Google Gemini API.
 
-import requests
+import asyncio
+import json
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import perf
+from cancellation import Cancelled
+from prompts import estimate_tokens
+from rate_limiter import RateLimiter
+from response_cache import get_response_cache, make_cache_key
 
 # --- Configuration ---
 # IMPORTANT: Replace with your actual Gemini API key.
 API_KEY = "YOUR_GEMINI_API_KEY_HERE"
-GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={API_KEY}"
+GEMINI_MODEL = "gemini-1.5-flash-latest"
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+# Quota of the API key; the defaults match the free tier of gemini-1.5-flash.
+REQUESTS_PER_MINUTE = 15
+TOKENS_PER_MINUTE = 1_000_000
+MAX_RETRIES = 4
+RETRYABLE_STATUS_CODES = (429, 500, 503)
+# Answers starting with these are error messages from this module, not model output.
+AI_ERROR_PREFIXES = ("Error:", "API Error", "API Request Error", "Error parsing API response", "AI model returned no content")
 
-def query_gemini(prompt: str) -> str:
+
+def is_error_answer(text: str) -> bool:
+    """True for error messages, including a stream that was interrupted part-way."""
+    return text.startswith(AI_ERROR_PREFIXES) or "\n\nAPI Request Error:" in text
+
+
+def parse_retry_after(value):
     """
-    Sends a prompt to the Gemini API with exponential backoff for rate limiting.
+    Returns the delay in seconds requested by a Retry-After header, or None.
     """
-    if not API_KEY or API_KEY == "YOUR_GEMINI_API_KEY_HERE":
-        return "Error: Gemini API key is not set in `gemini_client.py`."
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _sleep(seconds, cancel_token=None):
+    deadline = time.monotonic() + seconds
+    while True:
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, 0.25))
+
+
+class GeminiClient:
+    """
+    A Gemini client sharing one keep-alive connection pool and one rate limiter
+    across every caller. Use query() / stream() from threads, query_many() to fan
+    out many prompts, and aquery() / aquery_many() from asyncio code.
+    """
+
+    def __init__(self, api_key=None, model=GEMINI_MODEL, base_url=GEMINI_BASE_URL,
+                 limiter=None, max_retries=MAX_RETRIES, timeout=30, pool_size=10):
+        self._api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.limiter = limiter or get_shared_limiter()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+
+    @property
+    def api_key(self):
+        # Falls back to the module setting so editing API_KEY keeps working.
+        return self._api_key or API_KEY
+
+    @property
+    def endpoint(self):
+        return f"{self.base_url}/models/{self.model}:generateContent"
 
-    headers = {'Content-Type': 'application/json'}
-    data = {"contents": [{"parts": [{"text": prompt}]}]}
-    
-    retries = 3
-    delay = 1
-    for i in range(retries):
+    def _key_error(self):
+        if not self.api_key or self.api_key == "YOUR_GEMINI_API_KEY_HERE":
+            return "Error: Gemini API key is not set in `gemini_client.py`."
+        return None
+
+    def _cache_lookup(self, prompt, use_cache):
+        cache = get_response_cache() if use_cache else None
+        key = make_cache_key(self.model, self.endpoint, prompt)
+        if cache:
+            return cache, key, cache.get(key)
+        return None, key, None
+
+    # --- Blocking API ---
+
+    def query(self, prompt: str, use_cache: bool = True, cancel_token=None) -> str:
+        """
+        Sends a prompt and returns the answer text (or an error message).
+        If `cancel_token` is cancelled while waiting, raises Cancelled immediately.
+        """
+        error = self._key_error()
+        if error:
+            return error
+        with perf.span("gemini.query", prompt_tokens=estimate_tokens(prompt)) as attrs:
+            cache, cache_key, cached = self._cache_lookup(prompt, use_cache)
+            attrs["cached"] = cached is not None
+            if cached is not None:
+                return cached
+
+            def store(text):
+                if cache:
+                    cache.put(cache_key, text)
+
+            if cancel_token is not None:
+                return self._post_cancellable(prompt, cancel_token, store, attrs)
+            text, ok = self._post(prompt, attrs=attrs)
+            if ok:
+                store(text)
+            return text
+
+    def _post_cancellable(self, prompt, cancel_token, store, attrs):
+        """
+        Runs the request on a helper thread so the caller can stop waiting the moment
+        the token is cancelled. A request already on the wire finishes in the
+        background and its response is dropped (a successful answer still lands
+        in the cache); one still waiting for quota or a retry is abandoned.
+        """
+        cancel_token.raise_if_cancelled()
+        done = threading.Event()
+        outcome = {}
+
+        def worker():
+            try:
+                text, ok = self._post(prompt, cancel_token, attrs=attrs)
+            except Cancelled:
+                done.set()
+                return
+            if ok:
+                store(text)
+            outcome["text"] = text
+            done.set()
+
+        threading.Thread(target=worker, daemon=True).start()
+        remove_callback = cancel_token.add_callback(done.set)
         try:
-            # Set a 30-second timeout for the request
-            response = requests.post(GEMINI_API_URL, headers=headers, json=data, timeout=30)
-            
-            if response.status_code == 429:
-                raise requests.exceptions.HTTPError(f"429 Too Many Requests", response=response)
+            done.wait()
+        finally:
+            remove_callback()
+        if "text" not in outcome:
+            raise Cancelled()
+        return outcome["text"]
 
-            response.raise_for_status()
-            
+    def _post(self, prompt, cancel_token=None, acquired=False, attrs=None):
+        """
+        Sends one generateContent request. Returns the response text and whether
+        it is a real answer worth caching.
+        """
+        attrs = {} if attrs is None else attrs
+        data = {"contents": [{"parts": [{"text": prompt}]}]}
+        response, error = self._send(f"{self.endpoint}?key={self.api_key}", data, prompt,
+                                     stream=False, cancel_token=cancel_token, acquired=acquired, attrs=attrs)
+        if error:
+            return error, False
+        attrs["response_bytes"] = len(response.content)
+        try:
             response_json = response.json()
+            usage = response_json.get("usageMetadata", {})
+            attrs["input_tokens"] = usage.get("promptTokenCount")
+            attrs["output_tokens"] = usage.get("candidatesTokenCount")
             if 'candidates' in response_json and response_json['candidates']:
-                return response_json['candidates'][0]['content']['parts'][0]['text']
+                return response_json['candidates'][0]['content']['parts'][0]['text'], True
             else:
-                return "AI model returned no content. This might be due to safety filters."
-        
-        except requests.exceptions.HTTPError as e:
-            if e.response and e.response.status_code == 429:
-                if i < retries - 1:
-                    print(f"Rate limit exceeded. Retrying in {delay} seconds...")
-                    time.sleep(delay)
-                    delay *= 2
-                else:
-                    return "API Error: The server is still busy after multiple retries. Please wait a moment."
-            else:
-                return f"API Request Error: {e}"
-        except requests.exceptions.Timeout:
-            return "API Request Error: The request timed out. Please check your internet connection."
-        except requests.exceptions.RequestException as e:
-            return f"API Request Error: {e}"
-        except (KeyError, IndexError) as e:
-            return f"Error parsing API response: {e}\n\nRaw Response:\n{response.text}"
-    
-    return "API Error: The server is busy. Please try again later."
+                return "AI model returned no content. This might be due to safety filters.", False
+        except (KeyError, IndexError, ValueError) as e:
+            return f"Error parsing API response: {e}\n\nRaw Response:\n{response.text}", False
+
+    def _send(self, url, data, prompt, stream, cancel_token=None, acquired=False, attrs=None):
+        """
+        POSTs through the shared session within the rate limit, retrying busy and
+        rate-limited responses with jittered exponential backoff that honours
+        Retry-After. Returns (response, None) on success or (None, error text).
+        Retry count, request size and status are written into `attrs` for perf spans.
+        """
+        attrs = {} if attrs is None else attrs
+        tokens = estimate_tokens(prompt)
+        attrs["request_bytes"] = len(prompt.encode("utf-8"))
+        delay = 1.0
+        for attempt in range(self.max_retries):
+            attrs["retries"] = attempt
+            if not (acquired and attempt == 0):
+                self.limiter.acquire(tokens, cancel_token)
+            try:
+                response = self.session.post(url, json=data, timeout=self.timeout, stream=stream)
+            except requests.exceptions.Timeout:
+                return None, "API Request Error: The request timed out. Please check your internet connection."
+            except requests.exceptions.RequestException as e:
+                return None, f"API Request Error: {e}"
+
+            attrs["status"] = response.status_code
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                if not response.ok:
+                    response.close()
+                    return None, f"API Request Error: {response.status_code} {response.reason}"
+                return response, None
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            response.close()
+            if attempt == self.max_retries - 1:
+                break
+            wait = retry_after if retry_after is not None else delay / 2 + random.uniform(0, delay / 2)
+            if response.status_code == 429:
+                # Hold back every other caller too, not just this thread.
+                self.limiter.pause(wait)
+            _sleep(wait, cancel_token)
+            delay *= 2
+
+        return None, "API Error: The server is still busy after multiple retries. Please wait a moment."
+
+    # --- Streaming API ---
+
+    def stream(self, prompt: str, use_cache: bool = True, cancel_token=None):
+        """
+        Streams the answer to a prompt as text chunks using streamGenerateContent.
+        Errors are yielded as text, like query() returns them. A cached answer
+        is yielded as a single chunk. Raises Cancelled if `cancel_token` is cancelled.
+        """
+        error = self._key_error()
+        if error:
+            yield error
+            return
+        with perf.span("gemini.stream", prompt_tokens=estimate_tokens(prompt)) as attrs:
+            # Streaming and blocking calls share cache entries; the answer is the same.
+            cache, cache_key, cached = self._cache_lookup(prompt, use_cache)
+            attrs["cached"] = cached is not None
+            if cached is not None:
+                yield cached
+                return
+
+            url = f"{self.base_url}/models/{self.model}:streamGenerateContent?alt=sse&key={self.api_key}"
+            data = {"contents": [{"parts": [{"text": prompt}]}]}
+            start = time.perf_counter()
+            response, error = self._send(url, data, prompt, stream=True, cancel_token=cancel_token, attrs=attrs)
+            if error:
+                yield error
+                return
+            received = 0
+            for chunk in self._read_stream(response, cache, cache_key, cancel_token):
+                if not received:
+                    attrs["first_chunk_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                received += len(chunk.encode("utf-8"))
+                attrs["response_bytes"] = received
+                yield chunk
+
+    def _read_stream(self, response, cache, cache_key, cancel_token):
+        # Closing the response from the cancelling thread unblocks the read below.
+        remove_callback = cancel_token.add_callback(response.close) if cancel_token else (lambda: None)
+        parts = []
+        # SSE is UTF-8 by spec; without a charset in the Content-Type, requests would assume ISO-8859-1.
+        response.encoding = "utf-8"
+        try:
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                if not line or not line.startswith("data:"):
+                    continue
+                try:
+                    event = json.loads(line[len("data:"):])
+                    text = "".join(part.get("text", "") for part in event["candidates"][0]["content"]["parts"])
+                except (ValueError, KeyError, IndexError):
+                    continue
+                if text:
+                    parts.append(text)
+                    yield text
+        except (requests.exceptions.RequestException, AttributeError, ValueError) as e:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            yield f"\n\nAPI Request Error: the response stream was interrupted ({e})"
+            return
+        finally:
+            remove_callback()
+            response.close()
+
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        if not parts:
+            yield "AI model returned no content. This might be due to safety filters."
+        elif cache:
+            cache.put(cache_key, "".join(parts))
+
+    # --- Fan-out APIs ---
+
+    def query_many(self, prompts, max_workers: int = 8, use_cache: bool = True) -> list:
+        """
+        Answers many prompts concurrently over the shared pool; the limiter keeps
+        the whole batch within quota. Results are returned in prompt order.
+        """
+        prompts = list(prompts)
+        if not prompts:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as executor:
+            return list(executor.map(lambda p: self.query(p, use_cache=use_cache), prompts))
+
+    async def aquery(self, prompt: str, use_cache: bool = True) -> str:
+        """
+        asyncio variant of query(). Waiting for quota happens on the event loop;
+        only the HTTP call itself runs in a worker thread.
+        """
+        error = self._key_error()
+        if error:
+            return error
+        cache, cache_key, cached = self._cache_lookup(prompt, use_cache)
+        if cached is not None:
+            return cached
+        with perf.span("gemini.query", prompt_tokens=estimate_tokens(prompt), cached=False) as attrs:
+            await self.limiter.acquire_async(estimate_tokens(prompt))
+            text, ok = await asyncio.to_thread(self._post, prompt, None, True, attrs)
+        if ok and cache:
+            cache.put(cache_key, text)
+        return text
+
+    async def aquery_many(self, prompts, concurrency: int = 8, use_cache: bool = True) -> list:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(prompt):
+            async with semaphore:
+                return await self.aquery(prompt, use_cache=use_cache)
+
+        return await asyncio.gather(*(one(prompt) for prompt in prompts))
+
+    def close(self):
+        self.session.close()
+
+
+_shared_limiter = None
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_shared_limiter() -> RateLimiter:
+    """Returns the process-wide limiter so every client shares the key's quota."""
+    global _shared_limiter
+    with _default_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+        return _shared_limiter
+
+
+def get_default_client() -> GeminiClient:
+    global _default_client
+    if _default_client is None:
+        limiter = get_shared_limiter()
+        with _default_lock:
+            if _default_client is None:
+                _default_client = GeminiClient(limiter=limiter)
+    return _default_client
+
+
+def set_default_client(client: GeminiClient):
+    """Replaces the client used by query_gemini and friends (e.g. to target a local stand-in server)."""
+    global _default_client
+    with _default_lock:
+        _default_client = client
+
+
+def query_gemini(prompt: str, use_cache: bool = True, cancel_token=None) -> str:
+    """
+    Sends a prompt to the Gemini API, serving repeated prompts from the response cache.
+    If `cancel_token` is cancelled while waiting, raises Cancelled immediately.
+    """
+    return get_default_client().query(prompt, use_cache=use_cache, cancel_token=cancel_token)
+
+
+def stream_gemini(prompt: str, use_cache: bool = True, cancel_token=None):
+    """
+    Streams the answer to a prompt as text chunks; see GeminiClient.stream.
+    """
+    return get_default_client().stream(prompt, use_cache=use_cache, cancel_token=cancel_token)
+
+
+def query_many(prompts, max_workers: int = 8, use_cache: bool = True) -> list:
+    """
+    Answers many prompts concurrently within the rate limit; see GeminiClient.query_many.
+    """
+    return get_default_client().query_many(prompts, max_workers=max_workers, use_cache=use_cache)
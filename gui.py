@@ -1,9 +1,22 @@
 # gui.py
 # This module creates the enhanced user interface for Code-Mitra v3.0.
 
+import threading
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 
+import perf
+from text_render import MAX_RESULT_CHARS, ChunkedRenderer, EditorMirror, cap_text
+
+# Streamed text is batched and flushed to the widgets a few times per second.
+STREAM_FLUSH_MS = 200
+RESULT_TABS = (
+    ("explanation", "AI Code Explanation"),
+    ("errors", "Errors & AI Solution"),
+    ("answer", "Ask AI Results"),
+    ("tasks", "Markdown Task Breakdown"),
+)
+
 class AppGUI(tk.Tk):
     def __init__(self, controller):
         super().__init__()
@@ -18,6 +31,9 @@ class AppGUI(tk.Tk):
 
         self._create_widgets()
         self._after_id = None
+        self._stream_lock = threading.Lock()
+        self._stream_buffers = {}
+        self._stream_flush_scheduled = False
 
     def _configure_styles(self):
         """Configures the styles for the themed widgets."""
@@ -65,6 +81,9 @@ class AppGUI(tk.Tk):
         self.live_editor_tab = scrolledtext.ScrolledText(editor_frame, wrap=tk.WORD, bg="#1e1e1e", fg="white", insertbackground="white", relief=tk.FLAT, borderwidth=0, font=("Consolas", 11))
         self.live_editor_tab.pack(expand=True, fill="both")
         self.live_editor_tab.bind("<KeyRelease>", self.on_key_release)
+        # Mirrors the editor's lines in Python and records which ones were edited.
+        self.editor_mirror = EditorMirror(self.live_editor_tab)
+        self.renderer = ChunkedRenderer(self)
         live_editor_pane.add(editor_frame, weight=3)
 
         output_main_frame = ttk.Frame(live_editor_pane)
@@ -73,6 +92,9 @@ class AppGUI(tk.Tk):
         
         self.run_button = ttk.Button(output_controls_frame, text="Run Code & Analyze", command=self.controller.run_live_code)
         self.run_button.pack(side=tk.LEFT)
+
+        self.stop_button = ttk.Button(output_controls_frame, text="Stop", command=self.controller.stop_running_code)
+        self.stop_button.pack(side=tk.LEFT, padx=(10, 0))
         
         self.save_button = ttk.Button(output_controls_frame, text="Save", command=self.controller.overwrite_file, state='disabled')
         self.save_button.pack(side=tk.LEFT, padx=10)
@@ -84,51 +106,128 @@ class AppGUI(tk.Tk):
         self.output_area.pack(expand=True, fill="both", pady=(5,0))
         live_editor_pane.add(output_main_frame, weight=1)
 
-        self.explanation_tab = scrolledtext.ScrolledText(self.notebook, wrap=tk.WORD, bg="#1e1e1e", fg="white", insertbackground="white", relief=tk.FLAT, borderwidth=0)
-        self.errors_tab = scrolledtext.ScrolledText(self.notebook, wrap=tk.WORD, bg="#1e1e1e", fg="white", insertbackground="white", relief=tk.FLAT, borderwidth=0)
-        self.tasks_tab = scrolledtext.ScrolledText(self.notebook, wrap=tk.WORD, bg="#1e1e1e", fg="white", insertbackground="white", relief=tk.FLAT, borderwidth=0)
-        self.answer_tab = scrolledtext.ScrolledText(self.notebook, wrap=tk.WORD, bg="#1e1e1e", fg="white", insertbackground="white", relief=tk.FLAT, borderwidth=0)
-
         self.notebook.add(live_editor_pane, text="Live Code Editor")
-        self.notebook.add(self.explanation_tab, text="AI Code Explanation")
-        self.notebook.add(self.errors_tab, text="Errors & AI Solution")
-        self.notebook.add(self.answer_tab, text="Ask AI Results")
-        self.notebook.add(self.tasks_tab, text="Markdown Task Breakdown")
+        # Result tabs start as empty frames; their text widgets are built on first use.
+        self._tab_frames = {}
+        self._tab_widgets = {"output": self.output_area}
+        self._shown_chars = {}
+        for target_widget, title in RESULT_TABS:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title)
+            self._tab_frames[target_widget] = frame
+        self.performance_frame = ttk.Frame(self.notebook)
+        self.performance_tab = None
+        self.notebook.add(self.performance_frame, text="Performance")
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         self.status_bar = ttk.Label(self, text="Ready. Type in the Live Editor or load a file to start.", style="Status.TLabel", anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X, ipady=2, padx=2)
 
+    def call_after_first_paint(self, callback):
+        """Runs `callback` once on the Tk thread, right after the editor is first drawn."""
+        def on_expose(event=None):
+            self.live_editor_tab.unbind("<Expose>", bind_id)
+            self.after_idle(callback)
+        bind_id = self.live_editor_tab.bind("<Expose>", on_expose, "+")
+
     def on_key_release(self, event=None):
         if self._after_id: self.after_cancel(self._after_id)
         self._after_id = self.after(1500, self.trigger_live_analysis)
 
     def trigger_live_analysis(self):
-        content = self.live_editor_tab.get(1.0, tk.END)
-        self.controller.handle_live_code_analysis(content)
+        if self.renderer.is_rendering(self.live_editor_tab):
+            return  # A loaded file is still being inserted; it is analysed as a file.
+        if not self.editor_mirror.take_dirty():
+            return  # Only the cursor moved or a modifier key was released.
+        self.controller.handle_live_code_analysis(self.editor_mirror.text())
+
+    def get_editor_text(self) -> str:
+        """The editor's content, read from the mirror (safe from any thread, no Tk call)."""
+        return self.editor_mirror.text()
 
     def load_content_to_editor(self, content):
-        self.live_editor_tab.delete(1.0, tk.END)
-        self.live_editor_tab.insert(1.0, content)
-        self.notebook.select(0)
+        def _load():
+            self.notebook.select(0)
+            # Large files go in slice by slice; the loaded text is not an edit to re-analyse.
+            self.renderer.render(self.live_editor_tab, content, on_done=self.editor_mirror.take_dirty)
+        self.after(0, _load)
+
+    def _result_widget(self, target_widget):
+        """Returns the text widget of a result tab, creating it the first time it is needed."""
+        widget = self._tab_widgets.get(target_widget)
+        if widget is None and target_widget in self._tab_frames:
+            widget = scrolledtext.ScrolledText(self._tab_frames[target_widget], wrap=tk.WORD, bg="#1e1e1e", fg="white", insertbackground="white", relief=tk.FLAT, borderwidth=0)
+            widget.pack(expand=True, fill="both")
+            self._tab_widgets[target_widget] = widget
+        return widget
 
     def update_display(self, target_widget, content):
+        with self._stream_lock:
+            self._stream_buffers.pop(target_widget, None)
+
         def _update():
-            widget_map = {
-                "explanation": self.explanation_tab,
-                "errors": self.errors_tab,
-                "tasks": self.tasks_tab,
-                "output": self.output_area,
-                "answer": self.answer_tab
-            }
-            widget = widget_map.get(target_widget)
+            widget = self._result_widget(target_widget)
 
             if widget:
-                widget.delete(1.0, tk.END)
-                widget.insert(tk.END, content)
-                if target_widget != "output": self.notebook.select(widget)
+                with perf.span("gui.update", chars=len(content)):
+                    shown = cap_text(content)
+                    self._shown_chars[target_widget] = len(shown) if shown is content else MAX_RESULT_CHARS
+                    self.renderer.render(widget, shown)
+                if target_widget != "output": self.notebook.select(self._tab_frames[target_widget])
                 if target_widget == "answer": self.qa_input.delete(0, tk.END)
         self.after(0, _update)
 
+    def append_display(self, target_widget, content):
+        """
+        Appends streamed text to a result tab. Safe to call from any thread; chunks
+        are batched so the Tk main loop only sees a few updates per second.
+        """
+        with self._stream_lock:
+            self._stream_buffers.setdefault(target_widget, []).append(content)
+            if self._stream_flush_scheduled:
+                return
+            self._stream_flush_scheduled = True
+        self.after(STREAM_FLUSH_MS, self._flush_stream_buffers)
+
+    def _flush_stream_buffers(self):
+        with self._stream_lock:
+            buffers, self._stream_buffers = self._stream_buffers, {}
+            self._stream_flush_scheduled = False
+        for target_widget, chunks in buffers.items():
+            widget = self._result_widget(target_widget)
+            room = MAX_RESULT_CHARS - self._shown_chars.get(target_widget, 0)
+            if widget and room > 0:
+                text = "".join(chunks)
+                capped = cap_text(text, room)
+                self._shown_chars[target_widget] = (self._shown_chars.get(target_widget, 0) + len(text)
+                                                    if capped is text else MAX_RESULT_CHARS)
+                with perf.span("gui.append", chars=len(capped)):
+                    self.renderer.append(widget, capped)
+                    widget.see(tk.END)
+
+    def _on_tab_changed(self, event=None):
+        selected = self.notebook.select()
+        if selected == str(self.performance_frame):
+            self.refresh_performance()
+            return
+        for target_widget, frame in self._tab_frames.items():
+            if selected == str(frame):
+                self._result_widget(target_widget)
+
+    def _create_performance_tab(self):
+        controls = ttk.Frame(self.performance_frame)
+        controls.pack(fill=tk.X, pady=(5, 0))
+        ttk.Button(controls, text="Refresh", command=self.refresh_performance).pack(side=tk.LEFT)
+        ttk.Button(controls, text="Export JSON Lines...", command=self.controller.export_performance).pack(side=tk.LEFT, padx=10)
+        self.performance_tab = scrolledtext.ScrolledText(self.performance_frame, wrap=tk.NONE, bg="#1e1e1e", fg="white", relief=tk.FLAT, borderwidth=0, font=("Consolas", 10))
+        self.performance_tab.pack(expand=True, fill="both", pady=(5, 0))
+
+    def refresh_performance(self):
+        if self.performance_tab is None:
+            self._create_performance_tab()
+        self.performance_tab.delete(1.0, tk.END)
+        self.performance_tab.insert(tk.END, perf.format_stats() + "\n\n" + self.controller.prefetcher.format_stats())
+
     def update_status(self, message):
         self.after(0, lambda: self.status_bar.config(text=message))
 
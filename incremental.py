@@ -0,0 +1,293 @@
+# incremental.py
+# This module splits a Python module into top-level parts so analyses can reuse results for unchanged code.
+
+import ast
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+
+import perf
+import prompts
+from analyzer import fast_check
+from context_packer import outline, pack_context
+from lint_engine import LintResult
+from prompts import estimate_tokens
+
+MAX_STORED_RESULTS = 5000
+# Answers for several parts come back as sections that start with "### [n]".
+SECTION_PATTERN = re.compile(r"^\s*#{1,4}\s*\[(\d+)\][^\n]*\n?", re.MULTILINE)
+PENDING_TEXT = "(analysing...)"
+
+
+@dataclass(frozen=True)
+class Part:
+    """
+    A top-level definition, or a run of other top-level statements ("module code").
+    Parts cover every line of the module, including the comments and blank lines
+    after them. `fingerprint` ignores formatting and comments; `text_hash` does not.
+    """
+    label: str
+    start: int
+    end: int
+    fingerprint: str
+    text_hash: str
+    is_definition: bool
+
+
+def _hash(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _node_start(node):
+    return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+
+
+def split_parts(source: str):
+    """
+    Returns (tree, parts) for the source; raises SyntaxError if it does not parse.
+    """
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    groups = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            prefix = "class" if isinstance(node, ast.ClassDef) else "def"
+            groups.append((f"{prefix} {node.name}", [node], True))
+        elif groups and not groups[-1][2]:
+            groups[-1][1].append(node)
+        else:
+            groups.append(("module code", [node], False))
+
+    parts = []
+    for index, (label, nodes, is_definition) in enumerate(groups):
+        start = 1 if index == 0 else _node_start(nodes[0])
+        end = _node_start(groups[index + 1][1][0]) - 1 if index + 1 < len(groups) else max(1, len(lines))
+        text = "\n".join(line.rstrip() for line in lines[start - 1:end])
+        fingerprint = _hash(*(ast.dump(node) for node in nodes))
+        parts.append(Part(label, start, end, fingerprint, _hash(text), is_definition))
+    return tree, parts
+
+
+class ResultStore:
+    """
+    A thread-safe in-memory LRU of per-part results, shared by every buffer and
+    file so identical code is only analysed once per session.
+    """
+
+    def __init__(self, max_entries=MAX_STORED_RESULTS):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_store = ResultStore()
+
+
+def get_result_store() -> ResultStore:
+    return _store
+
+
+def split_sections(answer: str, count: int) -> dict:
+    """
+    Splits a multi-part answer into {part number: text}. Numbers that are out of
+    range are ignored; if the answer has no markers in range, it all goes to part 1.
+    """
+    matches = list(SECTION_PATTERN.finditer(answer))
+    if not matches:
+        return {1: answer.strip()}
+    sections = {}
+    for index, match in enumerate(matches):
+        number = int(match.group(1))
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(answer)
+        if 1 <= number <= count:
+            sections[number] = answer[match.end():end].strip()
+    return sections or {1: answer.strip()}
+
+
+class IncrementalAnalysis:
+    """
+    Plans the analysis of one version of a module: which parts already have
+    explanations, lint findings and AI solutions stored, and which must be sent
+    again. Results are stored per part so the next version reuses them.
+    """
+
+    def __init__(self, source: str, store: ResultStore = None):
+        self.source = source
+        self.lines = source.splitlines()
+        self.store = store or get_result_store()
+        self.tree, self.parts = split_parts(source)
+        # Lint findings also depend on the rest of the module: its imports,
+        # signatures and which imports are used anywhere.
+        unused_imports = sorted(m.message for m in fast_check(source).messages if m.symbol == "unused-import")
+        self.environment = _hash(outline(self.tree), *unused_imports)
+        self.lint_result = None
+
+    def _code(self, part):
+        # Leading lines are kept so part-relative line numbers point into this text.
+        return "\n".join(self.lines[part.start - 1:part.end]).rstrip("\n")
+
+    def _lint_key(self, part):
+        return ("lint", part.text_hash, self.environment)
+
+    def _explanation_key(self, part):
+        return ("explanation", part.fingerprint)
+
+    def _solution_key(self, part, messages):
+        return ("solution", part.fingerprint, tuple(messages))
+
+    def _part_messages(self, part):
+        return [replace(m, line=m.line + part.start - 1) for m in self.store.get(self._lint_key(part)) or ()]
+
+    def summary(self) -> str:
+        relint = sum(1 for part in self.parts if self.store.get(self._lint_key(part)) is None)
+        explain = sum(1 for part in self.parts if self.store.get(self._explanation_key(part)) is None)
+        return (f"Incremental analysis: {len(self.parts)} parts, {explain} to explain, "
+                f"{relint} to lint, the rest reused.")
+
+    # --- Lint ---
+
+    def lint(self, lint_source) -> LintResult:
+        """
+        Lints only the parts without stored findings and merges them with the
+        stored ones. lint_source(source) -> LintResult is called at most once.
+        """
+        dirty = [part for part in self.parts if self.store.get(self._lint_key(part)) is None]
+        if dirty:
+            if all(part.is_definition for part in dirty) and len(dirty) < len(self.parts):
+                source = self._stubbed_source(dirty)
+            else:
+                source = self.source
+            with perf.span("lint.incremental", parts=len(self.parts), linted=len(dirty)):
+                result = lint_source(source)
+            if result.error:
+                return result
+            for part in dirty:
+                self.store.put(self._lint_key(part), tuple(
+                    replace(m, line=m.line - part.start + 1)
+                    for m in result.messages if part.start <= m.line <= part.end
+                ))
+        messages = [m for part in self.parts for m in self._part_messages(part)]
+        self.lint_result = LintResult(messages=sorted(messages, key=lambda m: (m.line, m.column)))
+        return self.lint_result
+
+    def _stubbed_source(self, dirty):
+        """
+        The module with the bodies of every function outside `dirty` replaced by
+        `raise NotImplementedError` (which pylint treats as abstract), keeping line
+        numbers intact. Names, signatures and class layouts are all still there.
+        """
+        lines = list(self.lines)
+        keep = {(part.start, part.end) for part in dirty}
+        for node in self.tree.body:
+            if not any(start <= node.lineno <= end for start, end in keep):
+                for function in _outermost_functions(node):
+                    first = function.body[0]
+                    if first.lineno == function.lineno:
+                        continue  # One-line definition; nothing worth removing.
+                    lines[first.lineno - 1] = " " * first.col_offset + "raise NotImplementedError"
+                    for index in range(first.lineno, function.end_lineno):
+                        lines[index] = ""
+        return "\n".join(lines) + "\n"
+
+    # --- AI answers ---
+
+    def explanation_batches(self, budget_tokens: int) -> list:
+        """Returns [(parts, prompt)] covering every part without a stored explanation."""
+        todo = [part for part in self.parts if self.store.get(self._explanation_key(part)) is None]
+        return self._batches(todo, budget_tokens, prompts.parts_explanation_prompt, lambda part: ())
+
+    def solution_batches(self, budget_tokens: int) -> list:
+        """Returns [(parts, prompt)] for parts with lint findings but no stored AI solution."""
+        todo = [part for part in self.parts
+                if self._part_messages(part) and self.store.get(self._solution_key(part, self._relative(part))) is None]
+        return self._batches(todo, budget_tokens, prompts.parts_solution_prompt,
+                             lambda part: [m.line for m in self._relative(part)])
+
+    def _relative(self, part):
+        return self.store.get(self._lint_key(part)) or ()
+
+    def _batches(self, todo, budget_tokens, make_prompt, target_lines):
+        """target_lines(part) -> part-relative lines an oversized part must keep when packed."""
+        batches, current, used = [], [], 0
+        for part in todo:
+            code = self._code(part)
+            if estimate_tokens(code) > budget_tokens:
+                code = pack_context(code, budget_tokens, lines=target_lines(part)).text
+            cost = estimate_tokens(code)
+            if current and used + cost > budget_tokens:
+                batches.append(current)
+                current, used = [], 0
+            current.append((part, code))
+            used += cost
+        if current:
+            batches.append(current)
+        return [([part for part, _ in batch], make_prompt(self._prompt_items(batch))) for batch in batches]
+
+    def _prompt_items(self, batch):
+        items = []
+        for part, code in batch:
+            messages = "\n".join(f"line {m.line}: {m.msg_id}: {m.message} ({m.symbol})" for m in self._relative(part))
+            items.append((part.label, code, messages))
+        return items
+
+    def _store_sections(self, parts, answer, key):
+        sections = split_sections(answer, len(parts))
+        first = min(sections, default=None)
+        for number, part in enumerate(parts, start=1):
+            # Parts the model skipped point at the answer that exists, so they are not re-sent forever.
+            text = sections.get(number) or f"(Included in the answer for {parts[first - 1].label}.)"
+            self.store.put(key(part), text)
+
+    def store_explanations(self, parts, answer: str):
+        self._store_sections(parts, answer, self._explanation_key)
+
+    def store_solutions(self, parts, answer: str):
+        self._store_sections(parts, answer, lambda part: self._solution_key(part, self._relative(part)))
+
+    def render_explanations(self) -> str:
+        sections = []
+        for part in self.parts:
+            text = self.store.get(self._explanation_key(part)) or PENDING_TEXT
+            sections.append(f"### {part.label} (lines {part.start}-{part.end})\n{text}")
+        return "\n\n".join(sections)
+
+    def render_solutions(self) -> str:
+        sections = []
+        for part in self.parts:
+            relative = self._relative(part)
+            if relative:
+                text = self.store.get(self._solution_key(part, relative)) or PENDING_TEXT
+                sections.append(f"### {part.label} (lines {part.start}-{part.end})\n{text}")
+        return "\n\n".join(sections)
+
+
+def _outermost_functions(node):
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return [node]
+    if isinstance(node, ast.ClassDef):
+        return [f for child in node.body for f in _outermost_functions(child)]
+    return []
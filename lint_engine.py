@@ -0,0 +1,249 @@
+# lint_engine.py
+# This module keeps a small pool of warm pylint worker processes that lint source text directly.
+
+import io
+import multiprocessing
+import sys
+import threading
+from dataclasses import dataclass, field
+
+import perf
+
+DEFAULT_PYLINT_ARGS = ("--persistent=n", "--reports=n", "--score=n")
+
+
+@dataclass(frozen=True)
+class LintMessage:
+    line: int
+    column: int
+    symbol: str
+    msg_id: str
+    severity: str
+    message: str
+
+
+@dataclass
+class LintResult:
+    messages: list = field(default_factory=list)
+    error: str = None
+
+    @property
+    def is_clean(self) -> bool:
+        return self.error is None and not self.messages
+
+
+def format_messages(result: LintResult, module_name: str = "live_code") -> str:
+    """
+    Formats lint results in pylint's familiar text layout for display and prompts.
+    """
+    if result.error:
+        return result.error
+    return "\n".join(
+        f"{module_name}.py:{m.line}:{m.column}: {m.msg_id}: {m.message} ({m.symbol})"
+        for m in result.messages
+    )
+
+
+def lint_in_process(source: str, module_name: str = "live_code", extra_args=DEFAULT_PYLINT_ARGS) -> list:
+    """
+    Lints source text with pylint in the current process and returns LintMessage
+    records. Not thread-safe; callers are the engine's workers and batch processes.
+    """
+    from pylint.lint import Run
+    from pylint.reporters import CollectingReporter
+
+    reporter = CollectingReporter()
+    # pylint's --from-stdin mode detaches sys.stdin, so it must wrap a binary buffer.
+    original_stdin = sys.stdin
+    sys.stdin = io.TextIOWrapper(io.BytesIO(source.encode("utf-8")), encoding="utf-8")
+    try:
+        Run([*extra_args, "--from-stdin", f"{module_name}.py"], reporter=reporter, exit=False)
+    finally:
+        sys.stdin = original_stdin
+    return [
+        LintMessage(m.line, m.column, m.symbol, m.msg_id, m.category, m.msg)
+        for m in reporter.messages
+    ]
+
+
+def _worker_main(conn, extra_args):
+    """
+    Entry point of a worker process. Imports pylint once and then serves lint requests
+    until the pipe is closed, so astroid's module caches stay warm between runs.
+    """
+    import pylint.lint  # noqa: F401  (warm import)
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+        source, module_name = request
+        try:
+            conn.send(("ok", lint_in_process(source, module_name, extra_args)))
+        except Exception as e:
+            conn.send(("error", f"An unexpected error occurred during pylint analysis: {e}"))
+
+
+class LintWorker:
+    """
+    One long-lived pylint process connected through a pipe.
+    """
+
+    def __init__(self, context, extra_args):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, tuple(extra_args)), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def lint(self, source: str, module_name: str, timeout: float) -> LintResult:
+        self.conn.send((source, module_name))
+        if not self.conn.poll(timeout):
+            self.kill()
+            return LintResult(error=f"Pylint analysis timed out after {timeout} seconds.")
+        status, payload = self.conn.recv()
+        if status != "ok":
+            return LintResult(error=payload)
+        return LintResult(messages=payload)
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class LintEngine:
+    """
+    A fixed-size pool of warm pylint workers. Workers are started on first use
+    and replaced automatically if one dies or times out.
+    """
+
+    def __init__(self, workers: int = 1, extra_args=DEFAULT_PYLINT_ARGS):
+        # 'spawn' keeps the worker from inheriting Tk and thread state from the GUI process.
+        self._context = multiprocessing.get_context("spawn")
+        self._extra_args = tuple(extra_args)
+        self._size = max(1, workers)
+        self._idle = []
+        self._started = 0
+        # Notified whenever a worker is returned or a dead one frees its slot.
+        self._available = threading.Condition()
+        self._closed = False
+
+    def _acquire(self) -> LintWorker:
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Lint engine has been shut down.")
+                if self._idle:
+                    return self._idle.pop()
+                if self._started < self._size:
+                    self._started += 1
+                    break
+                self._available.wait()
+        try:
+            return LintWorker(self._context, self._extra_args)
+        except BaseException:
+            self._free_slot()
+            raise
+
+    def _free_slot(self):
+        with self._available:
+            self._started -= 1
+            self._available.notify()
+
+    def _release(self, worker: LintWorker):
+        with self._available:
+            if not self._closed and worker.is_alive():
+                self._idle.append(worker)
+                self._available.notify()
+                return
+        if self._closed:
+            worker.stop()
+        else:
+            worker.kill()
+        # A dead (killed, timed-out or crashed) worker frees its slot: the next caller starts a fresh one.
+        self._free_slot()
+
+    def lint_source(self, source: str, module_name: str = "live_code", timeout: float = 60,
+                    cancel_token=None) -> LintResult:
+        """
+        Lints Python source text and returns structured messages. Cancelling
+        `cancel_token` kills the worker mid-run and raises Cancelled.
+        """
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        try:
+            worker = self._acquire()
+        except Exception as e:
+            return LintResult(error=f"An unexpected error occurred during pylint analysis: {e}")
+        remove_callback = cancel_token.add_callback(worker.process.kill) if cancel_token else None
+        try:
+            with perf.span("pylint", lines=source.count("\n") + 1) as attrs:
+                result = worker.lint(source, module_name, timeout)
+                attrs["messages"] = len(result.messages)
+        except (EOFError, OSError) as e:
+            worker.kill()
+            result = LintResult(error=f"Pylint worker stopped unexpectedly: {e}")
+        finally:
+            if remove_callback:
+                remove_callback()
+            if cancel_token is not None and cancel_token.cancelled:
+                worker.kill()  # Reap it now, so it is not mistaken for a live worker below.
+            self._release(worker)
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        return result
+
+    def warm_up(self):
+        """
+        Starts every worker and runs a trivial lint so the first real run is fast.
+        """
+        threads = [
+            threading.Thread(target=self.lint_source, args=("x = 1\n",), daemon=True)
+            for _ in range(self._size)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def shutdown(self):
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for worker in idle:
+            worker.stop()
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_lint_engine() -> LintEngine:
+    """
+    Returns the shared lint engine used by the application.
+    """
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = LintEngine()
+        return _default_engine
@@ -1,34 +1,120 @@
 # main_app.py
 # The main controller for the Code-Mitra v3.0 application.
 
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import threading
 import time
-import os
-import tempfile
-import subprocess
+_STARTED = time.perf_counter()  # Everything below counts as import time in --profile-startup.
 
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import importlib
+import sys
+from tkinter import filedialog, messagebox
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from gui import AppGUI
-from analyzer import run_pylint, read_file_content
-from gemini_client import query_gemini
+from analyzer import fast_check, read_file_content
+from cancellation import CancelToken
+from context_packer import (EXPLANATION_BUDGET, QUESTION_BUDGET, SOLUTION_BUDGET,
+                            pack_context, symbols_in_question)
+from execution_pool import ExecutionPool
+from lint_engine import get_lint_engine, format_messages
+from incremental import IncrementalAnalysis
+from pipeline import Stage, run_stages
+import perf
+from prefetch import PREFETCH_FILES, Prefetcher
+import prompts
+from scheduler import AnalysisScheduler
+from symbol_index import SymbolIndex
+from watch_pipeline import DEFAULT_IGNORE_GLOBS, EventPipeline
+
+_IMPORTED = time.perf_counter()
+
+LIVE_EDITOR_KEY = "<live editor>"
+QUESTION_KEY = "<question>"
+# Slow to import (requests, asyncio, watchdog) and not needed to show the window;
+# loaded in the background after the first paint, or on first use if that is sooner.
+WARM_UP_MODULES = ("gemini_client", "watchdog.observers", "watchdog.events")
+# Quick-check findings that hold back pylint and the AI on keystroke pauses; the rest are shown only.
+BLOCKING_SYMBOLS = ("syntax-error", "undefined-variable")
+# --profile-startup fails (exit status 1) if the editor takes longer than this to appear.
+STARTUP_BUDGET_MS = 1000
 
 class MainApplication:
-    def __init__(self):
-        self.gui = AppGUI(self)
+    def __init__(self, gui_factory=AppGUI, profile_startup=False):
+        # gui_factory lets the benchmark harness drive the controller without Tk.
+        self.gui = gui_factory(self)
+        self.profile_startup = profile_startup
+        self.exit_code = 0
         self.observer = None
+        self.event_pipeline = None
+        # Definitions, references and docstrings of the monitored folder, for project-aware Q&A.
+        self.symbol_index = None
+        # Paths matching these globs (below the monitored folder) never trigger analysis.
+        self.watch_ignore_globs = DEFAULT_IGNORE_GLOBS
         self.monitoring_path = None
         self.current_file_path = None
-        self.is_analyzing = False
-        self.analysis_lock = threading.Lock()
+        # Latest-wins: newer content for a buffer or file cancels the analysis in flight.
+        self.scheduler = AnalysisScheduler()
+        # Pre-analyses the files likely to be opened next while the scheduler is idle.
+        self.prefetcher = Prefetcher(self.scheduler.is_busy)
+        # Shared by the analysis stages so independent steps (AI explanation, pylint) overlap.
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="analysis")
+        # Pre-started interpreters make "Run Code" start in milliseconds.
+        self.execution_pool = ExecutionPool()
+        self.run_token = None
+        self.run_lock = threading.Lock()
         self.gui.protocol("WM_DELETE_WINDOW", self.on_closing)
+        perf.record("startup.imports", _IMPORTED - _STARTED)
+        perf.record("startup.window", time.perf_counter() - _IMPORTED)
+        self.gui.call_after_first_paint(self._on_first_paint)
 
     def run(self):
         self.gui.mainloop()
 
+    def _on_first_paint(self):
+        perf.record("startup.first_paint", time.perf_counter() - _STARTED)
+        threads = [
+            threading.Thread(target=self._warm_up_imports, daemon=True),
+            # Start the pylint worker and the code runners so the first analysis and run are fast.
+            threading.Thread(target=self._timed_warm_up, args=("lint", get_lint_engine().warm_up), daemon=True),
+            threading.Thread(target=self._timed_warm_up, args=("execution", self.execution_pool.warm_up), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        if self.profile_startup:
+            threading.Thread(target=self._report_startup, args=(threads,), daemon=True).start()
+
+    def _warm_up_imports(self):
+        for name in WARM_UP_MODULES:
+            with perf.span("startup.warm_up", target=name):
+                importlib.import_module(name)
+
+    @staticmethod
+    def _timed_warm_up(name, warm_up):
+        with perf.span("startup.warm_up", target=name):
+            warm_up()
+
+    def _report_startup(self, warm_up_threads):
+        """--profile-startup: prints where the start-up time went, then closes the app."""
+        for thread in warm_up_threads:
+            thread.join()
+        rows = {}
+        for row in perf.spans():
+            if row["stage"] == "startup.warm_up":
+                rows[f"warm-up: {row['target']}"] = row["duration_ms"]
+            elif row["stage"].startswith("startup."):
+                rows[row["stage"]] = row["duration_ms"]
+        first_paint = rows.get("startup.first_paint", 0)
+        print("Start-up profile (ms)")
+        print(f"  {'imports':<32}{rows.get('startup.imports', 0):>10.1f}")
+        print(f"  {'controller + window':<32}{rows.get('startup.window', 0):>10.1f}")
+        print(f"  {'editor painted (total)':<32}{first_paint:>10.1f}   budget {STARTUP_BUDGET_MS}")
+        for name, duration in rows.items():
+            if name.startswith("warm-up"):
+                print(f"  {name:<32}{duration:>10.1f}   (background)")
+        print("For a per-module import breakdown run: python -X importtime main_app.py --profile-startup")
+        self.exit_code = 0 if first_paint <= STARTUP_BUDGET_MS else 1
+        self.gui.after(0, self.on_closing)
+
     def select_folder(self):
         path = filedialog.askdirectory()
         if not path: return
@@ -36,16 +122,44 @@ class MainApplication:
         self.monitoring_path = path
         self.gui.update_folder_label(self.monitoring_path)
         
-        if self.observer and self.observer.is_alive():
-            self.observer.stop()
-            self.observer.join()
+        self._stop_monitoring()
 
-        event_handler = FileChangeHandler(self)
+        from watchdog.observers import Observer
+
+        self.symbol_index = SymbolIndex(path, ignore_globs=self.watch_ignore_globs)
+        threading.Thread(target=self._build_index, args=(self.symbol_index,), daemon=True).start()
+        self.event_pipeline = EventPipeline(self._analyze_watched_file, root=path,
+                                            ignore_globs=self.watch_ignore_globs)
+        event_handler = FileChangeHandler(self.event_pipeline, self.symbol_index)
         self.observer = Observer()
         self.observer.schedule(event_handler, self.monitoring_path, recursive=True)
         self.observer.start()
         self.gui.update_status(f"Started monitoring folder: {self.monitoring_path}")
 
+    def _build_index(self, index):
+        """Loads the saved index for the folder, then re-indexes only the files changed since."""
+        loaded = index.load()
+        updated = index.refresh()
+        index.save()
+        stats = index.stats()
+        if index is self.symbol_index:
+            self.gui.update_status(f"Project index {'loaded' if loaded else 'built'}: {stats['files']} files, "
+                                   f"{stats['chunks']} definitions, {updated} (re-)indexed.")
+            self.prefetcher.seed(index.recent_files(PREFETCH_FILES))
+
+    def _stop_monitoring(self):
+        if self.observer and self.observer.is_alive():
+            self.observer.stop()
+            self.observer.join()
+        if self.event_pipeline:
+            self.event_pipeline.stop()
+            self.event_pipeline = None
+        self.prefetcher.clear()
+        if self.symbol_index:
+            # Not a daemon thread, so the save also completes when the app is closing.
+            threading.Thread(target=self.symbol_index.save).start()
+            self.symbol_index = None
+
     def load_and_analyze_file(self):
         file_path = filedialog.askopenfilename(
             filetypes=(("Python files", "*.py"), ("Markdown files", "*.md"))
@@ -54,135 +168,266 @@ class MainApplication:
         
         self.current_file_path = file_path
         self.gui.save_button.config(state='normal')
-        threading.Thread(target=self.handle_file_analysis, args=(file_path,), daemon=True).start()
+        threading.Thread(target=self.handle_file_analysis, args=(file_path, True), daemon=True).start()
 
-    def handle_live_code_analysis(self, content: str):
-        with self.analysis_lock:
-            if self.is_analyzing:
-                return
-            self.is_analyzing = True
-        
-        threading.Thread(target=self._process_analysis, args=(content, "python"), daemon=True).start()
+    def _submit(self, key, func, *args):
+        """Schedules foreground work; background prefetching gives way to it."""
+        if key != QUESTION_KEY:
+            # Every buffer and file shares the result tabs, so the newest analysis owns them.
+            self.scheduler.cancel_others(key, keep=(QUESTION_KEY,))
+        self.scheduler.submit(key, func, *args)
+        # Only now is the scheduler busy, so the prefetcher cannot pick up its next step in between.
+        self.prefetcher.interrupt()
 
-    def handle_file_analysis(self, file_path):
-        with self.analysis_lock:
-            if self.is_analyzing:
-                return
-            self.is_analyzing = True
+    def handle_live_code_analysis(self, content: str, full: bool = False):
+        """
+        Keystroke pauses run only the fast local checks until they pass; `full`
+        (explicit Run or save) always runs pylint and the AI stages as well.
+        """
+        self._submit(LIVE_EDITOR_KEY, self._process_analysis, content, "python", full)
+
+    def handle_file_analysis(self, file_path, opened=False):
+        """`opened` is True when the user loaded the file, as opposed to a watch event."""
+        content = read_file_content(file_path)
+        self.gui.load_content_to_editor(content)
+        if opened and self.prefetcher.claim(file_path, content):
+            self.gui.update_status("Showing the results prepared in the background.")
 
-        self.gui.load_content_to_editor(read_file_content(file_path))
-        
         file_type = "python" if file_path.endswith(".py") else "markdown"
-        # Since load_content_to_editor is async, get content from the widget after a small delay or directly
-        # For simplicity, we'll get it directly here.
-        content = self.gui.live_editor_tab.get(1.0, tk.END)
-        threading.Thread(target=self._process_analysis, args=(content, file_type), daemon=True).start()
+        self._submit(file_path, self._process_analysis, content, file_type)
 
-    def _process_analysis(self, content, file_type):
-        """A centralized method to run analysis and reset the flag."""
-        try:
-            self.current_file_content = content
-            if not content.strip():
-                self.gui.update_display("explanation", "File is empty.")
-                return
+    def _analyze_watched_file(self, file_path):
+        """Pipeline handler: waits for the analysis so the pipeline's worker count bounds concurrency."""
+        index = self.symbol_index
+        if index:
+            index.update_file(file_path)
+        self.prefetcher.touch(file_path)
+        self.handle_file_analysis(file_path)
+        self.scheduler.wait_idle(file_path)
+
+    def _process_analysis(self, token, content, file_type, full=True):
+        """A centralized method to run one scheduled analysis; `token` is cancelled when newer content arrives."""
+        self.current_file_content = content
+        if not content.strip():
+            self._show(token, "explanation", "File is empty.")
+            return
+        if file_type == "python" and not full and not self._fast_checks_pass(token, content):
+            return
 
+        with perf.span(f"analysis.{file_type}", chars=len(content)):
             if file_type == "python":
-                self._analyze_python_file(content)
+                self._analyze_python_file(token, content)
             elif file_type == "markdown":
-                self._analyze_markdown_file(content)
-            
+                self._analyze_markdown_file(token, content)
+
+        if not token.cancelled:
             self.gui.update_status(f"Analysis complete. Ready.")
-        finally:
-            with self.analysis_lock:
-                self.is_analyzing = False
-
-    def _analyze_python_file(self, content):
-        self.gui.update_status("Asking AI for code explanation...")
-        explanation_prompt = (
-            f"Please analyze the following Python code and provide three things:\n"
-            f"1. A clear explanation of the code's logic and purpose.\n"
-            f"2. Suggestions for alternative methods or approaches to achieve the same result.\n"
-            f"3. Potential optimizations or improvements.\n\n"
-            f"--- PYTHON CODE ---\n{content}"
-        )
-        explanation = query_gemini(explanation_prompt)
-        self.gui.update_display("explanation", explanation)
-        self.gui.update_status("Explanation received. Analyzing for errors...")
 
-        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.py', encoding='utf-8') as temp_file:
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        pylint_errors = run_pylint(temp_file_path)
-        os.remove(temp_file_path)
+    def _fast_checks_pass(self, token, content):
+        """
+        Runs the syntax and AST checks (milliseconds, no API calls). Problems are
+        shown straight away; only syntax errors and undefined names stop the slow
+        pylint and AI stages for this pause; warnings such as a not-yet-used import do not.
+        """
+        result = fast_check(content)
+        if result.is_clean:
+            return True
+        blocking = [m for m in result.messages if m.symbol in BLOCKING_SYMBOLS]
+        if not blocking:
+            self._show(token, "errors", f"--- QUICK CHECKS ---\n{format_messages(result)}\n\n"
+                                        "Running the full analysis...")
+            return True
+        self._show(token, "errors", f"--- QUICK CHECKS ---\n{format_messages(result)}\n\n"
+                                    "Fix the errors (or save / run the code) to get the full analysis.")
+        if not token.cancelled:
+            first = blocking[0]
+            self.gui.update_status(f"Quick checks: {len(blocking)} error(s), first on line {first.line}.")
+        return False
 
-        if "Your code has been rated at 10.00/10" in pylint_errors or not pylint_errors.strip():
-            solution = "No errors found. Your code is clean!"
-            self.gui.update_display("errors", solution)
-        else:
+    def _show(self, token, target_widget, content):
+        """Updates a result tab unless the analysis has been superseded."""
+        if not token.cancelled:
+            self.gui.update_display(target_widget, content)
+
+    def _stream_to(self, token, target_widget, prompt, header=""):
+        """Streams an AI answer into a result tab as it arrives and returns the full text."""
+        self._show(token, target_widget, header)
+        from gemini_client import stream_gemini
+
+        parts = [header]
+        for chunk in stream_gemini(prompt, cancel_token=token):
+            parts.append(chunk)
+            if not token.cancelled:
+                self.gui.append_display(target_widget, chunk)
+        return "".join(parts)
+
+    def _analyze_python_file(self, token, content):
+        try:
+            analysis = IncrementalAnalysis(content)
+        except SyntaxError:
+            analysis = None
+        self.gui.update_status(f"{analysis.summary() + ' ' if analysis else ''}"
+                               "Asking AI for code explanation and analyzing for errors...")
+        if analysis is not None:
+            run_stages([
+                Stage("explanation", lambda: self._explain_parts(token, analysis)),
+                Stage("lint", lambda: analysis.lint(
+                    lambda source: get_lint_engine().lint_source(source, cancel_token=token))),
+                Stage("solution", lambda lint_result: self._solve_part_errors(token, analysis, lint_result),
+                      deps=["lint"]),
+            ], self.executor)
+            return
+        # Code that does not parse (e.g. saved mid-edit) is analysed as a whole.
+        run_stages([
+            Stage("explanation", lambda: self._explain_code(token, content)),
+            Stage("lint", lambda: get_lint_engine().lint_source(content, cancel_token=token)),
+            Stage("solution", lambda lint_result: self._solve_lint_errors(token, content, lint_result),
+                  deps=["lint"]),
+        ], self.executor)
+
+    def _stream_parts(self, token, target_widget, batches, render, store, header=""):
+        """
+        Shows the stored answers for every part at once, then streams an answer
+        for each batch of changed parts and merges it in when it completes.
+        """
+        from gemini_client import is_error_answer
+
+        self._show(token, target_widget, header + render())
+        for parts, prompt in batches:
+            if token.cancelled:
+                return
+            progress = f"{header}{render()}\n\n--- Analysing {len(parts)} changed part(s) ---\n"
+            answer = self._stream_to(token, target_widget, prompt, progress)[len(progress):]
+            if not is_error_answer(answer):
+                store(parts, answer)
+            self._show(token, target_widget, header + render() + (f"\n\n{answer}" if is_error_answer(answer) else ""))
+
+    def _explain_parts(self, token, analysis):
+        self._stream_parts(token, "explanation", analysis.explanation_batches(EXPLANATION_BUDGET),
+                           analysis.render_explanations, analysis.store_explanations)
+
+    def _solve_part_errors(self, token, analysis, lint_result):
+        if lint_result.error or lint_result.is_clean:
+            return self._solve_lint_errors(token, analysis.source, lint_result)
+        header = f"--- DETECTED ERRORS ---\n{format_messages(lint_result)}\n\n--- AI SUGGESTED SOLUTION ---\n"
+        batches = analysis.solution_batches(SOLUTION_BUDGET)
+        if batches:
             self.gui.update_status("Errors found. Asking AI for a solution...")
-            solution_prompt = (
-                f"The Python code below has these pylint errors:\n\n"
-                f"--- DETECTED ERRORS ---\n{pylint_errors}\n\n"
-                f"--- PYTHON CODE ---\n{content}\n\n"
-                f"Please explain these errors in simple terms and provide the corrected, complete code snippet."
-            )
-            solution = f"--- DETECTED ERRORS ---\n{pylint_errors}\n\n--- AI SUGGESTED SOLUTION ---\n" + query_gemini(solution_prompt)
-            self.gui.update_display("errors", solution)
-
-    def _analyze_markdown_file(self, content):
+        self._stream_parts(token, "errors", batches, analysis.render_solutions, analysis.store_solutions, header)
+
+    def _explain_code(self, token, content):
+        packed = pack_context(content, EXPLANATION_BUDGET)
+        return self._stream_to(token, "explanation", prompts.explanation_prompt(packed.text))
+
+    def _solve_lint_errors(self, token, content, lint_result):
+        if lint_result.error:
+            self._show(token, "errors", lint_result.error)
+            return lint_result.error
+        if lint_result.is_clean:
+            solution = "No errors found. Your code is clean!"
+            self._show(token, "errors", solution)
+            return solution
+
+        pylint_errors = format_messages(lint_result)
+        self.gui.update_status("Errors found. Asking AI for a solution...")
+        header = f"--- DETECTED ERRORS ---\n{pylint_errors}\n\n--- AI SUGGESTED SOLUTION ---\n"
+        packed = pack_context(content, SOLUTION_BUDGET, lines=[m.line for m in lint_result.messages])
+        return self._stream_to(token, "errors", prompts.lint_solution_prompt(pylint_errors, packed.text), header)
+
+    def _analyze_markdown_file(self, token, content):
         self.gui.update_status("Asking AI to break down the task...")
-        task_prompt = f"Break down the task in this Markdown:\n\n---\n\n{content}"
-        task_breakdown = query_gemini(task_prompt)
-        self.gui.update_display("tasks", task_breakdown)
+        self._stream_to(token, "tasks", prompts.markdown_task_prompt(content))
 
     def handle_ask_question(self):
         question = self.gui.qa_input.get()
-        live_code = self.gui.live_editor_tab.get(1.0, tk.END)
+        live_code = self.gui.get_editor_text()
 
         if not question: return self.gui.update_status("Please type a question first.")
         
         self.gui.update_status("Asking AI... Please wait.")
-        threading.Thread(target=self._process_question, args=(question, live_code), daemon=True).start()
+        self._submit(QUESTION_KEY, self._process_question, question, live_code)
+
+    def _process_question(self, token, question, live_code):
+        from gemini_client import query_gemini
 
-    def _process_question(self, question, live_code):
         if not live_code.strip():
-            prompt = f"Generate a Python code snippet for the following request: '{question}'. Provide only the code, without any explanation before or after."
-            answer = query_gemini(prompt)
+            answer = query_gemini(prompts.code_generation_prompt(question), cancel_token=token)
+            if token.cancelled: return
             self.gui.load_content_to_editor(answer)
             self.gui.update_display("answer", f"--- Your Request ---\n{question}\n\n--- AI Generated Code ---\n{answer}")
         else:
-            prompt = f"Context:\n---\n{live_code}\n---\n\nQuestion: '{question}'\n\nAnswer:"
-            answer = query_gemini(prompt)
-            self.gui.update_display("answer", f"--- Your Question ---\n{question}\n\n--- AI's Answer ---\n{answer}")
-        
-        self.gui.update_status("Ready.")
+            packed = pack_context(live_code, QUESTION_BUDGET, symbols=symbols_in_question(question, live_code))
+            context = packed.text
+            index = self.symbol_index
+            if index:
+                # The loaded file is already in the editor, so only other files are attached.
+                related = index.context_for(question, exclude_paths=[p for p in [self.current_file_path] if p])
+                if related:
+                    context += f"\n\n--- Related code elsewhere in the project ---\n{related}"
+            prompt = prompts.question_prompt(question, context)
+            self._stream_to(token, "answer", prompt, f"--- Your Question ---\n{question}\n\n--- AI's Answer ---\n")
+
+        if not token.cancelled:
+            self.gui.update_status("Ready.")
 
     def run_live_code(self):
-        code = self.gui.live_editor_tab.get(1.0, tk.END)
+        code = self.gui.get_editor_text()
         if not code.strip():
             self.gui.update_display("output", "Nothing to run.")
             return
 
         threading.Thread(target=self._execute_code, args=(code,), daemon=True).start()
-        threading.Thread(target=self.handle_live_code_analysis, args=(code,), daemon=True).start()
+        threading.Thread(target=self.handle_live_code_analysis, args=(code, True), daemon=True).start()
 
     def _execute_code(self, code):
+        token = CancelToken()
+        with self.run_lock:
+            previous, self.run_token = self.run_token, token
+        if previous:
+            previous.cancel()
+
         self.gui.update_status("Executing code...")
+        self.gui.update_display("output", "--- OUTPUT ---\n")
+        current_stream = ["stdout"]
+
+        def on_output(stream, text):
+            # A superseded run must not write into the next run's output.
+            if token.cancelled:
+                return
+            if stream != current_stream[0]:
+                # Label each switch between the streams, as the one-shot run did with --- ERRORS ---.
+                current_stream[0] = stream
+                text = ("\n--- ERRORS ---\n" if stream == "stderr" else "\n--- OUTPUT ---\n") + text
+            self.gui.append_display("output", text)
+
         try:
-            process = subprocess.run(
-                ['python', '-c', code], capture_output=True, text=True, encoding='utf-8', timeout=10
-            )
-            output = f"--- OUTPUT ---\n{process.stdout}\n"
-            if process.stderr: output += f"--- ERRORS ---\n{process.stderr}"
-            self.gui.update_display("output", output)
-        except subprocess.TimeoutExpired:
-            self.gui.update_display("output", "Execution timed out after 10 seconds.")
+            result = self.execution_pool.run(code, on_output, cancel_token=token)
+            if result.cancelled and self.run_token is not None:
+                return  # Superseded by a newer run, which owns the output area now.
+            self.gui.append_display("output", f"\n--- {result.summary()} ---\n")
+            self.gui.update_status(result.summary())
         except Exception as e:
             self.gui.update_display("output", f"An error occurred: {e}")
 
+    def stop_running_code(self):
+        with self.run_lock:
+            token, self.run_token = self.run_token, None
+        if token:
+            token.cancel()
+
+    def export_performance(self):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".jsonl", filetypes=[("JSON Lines", "*.jsonl"), ("All Files", "*.*")]
+        )
+        if not file_path: return
+        try:
+            count = perf.export_jsonl(file_path)
+            self.gui.update_status(f"Exported {count} timing spans to {file_path}")
+        except OSError as e:
+            messagebox.showerror("Export Error", f"Could not export timings:\n{e}")
+
     def save_live_code(self):
-        code = self.gui.live_editor_tab.get(1.0, tk.END)
+        code = self.gui.get_editor_text()
         file_path = filedialog.asksaveasfilename(
             defaultextension=".py", filetypes=[("Python Files", "*.py"), ("All Files", "*.*")]
         )
@@ -193,7 +438,7 @@ class MainApplication:
         if not self.current_file_path:
             messagebox.showerror("Error", "No file is currently loaded to save over.")
             return
-        code = self.gui.live_editor_tab.get(1.0, tk.END)
+        code = self.gui.get_editor_text()
         self._save_to_file(self.current_file_path, code)
 
     def _save_to_file(self, file_path, content):
@@ -201,27 +446,73 @@ class MainApplication:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
             self.gui.update_status(f"File saved successfully to {file_path}")
+            pipeline = self.event_pipeline
+            if file_path.endswith(".py") and not (pipeline and pipeline.wants(file_path)):
+                # Saving is an explicit request for the full analysis, even if the quick checks fail.
+                # Inside the monitored folder the watcher's analysis of the saved file is that analysis.
+                self.handle_live_code_analysis(content, full=True)
         except Exception as e:
             self.gui.update_status(f"Error saving file: {e}")
             messagebox.showerror("Save Error", f"Could not save file:\n{e}")
 
     def on_closing(self):
-        if self.observer and self.observer.is_alive():
-            self.observer.stop()
-            self.observer.join()
+        self._stop_monitoring()
+        self.prefetcher.stop()
+        self.stop_running_code()
+        self.execution_pool.shutdown()
+        self.scheduler.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        get_lint_engine().shutdown()
         self.gui.destroy()
 
-class FileChangeHandler(FileSystemEventHandler):
-    def __init__(self, controller):
-        self.controller = controller
-        self.last_triggered = 0
+class FileChangeHandler:
+    """
+    Forwards watchdog events to the event pipeline, which debounces and dedupes them.
+    Duck-types watchdog's FileSystemEventHandler so watchdog need not be imported at start-up.
+    """
+
+    def __init__(self, pipeline, index=None):
+        self.pipeline = pipeline
+        self.index = index
+
+    def dispatch(self, event):
+        """Called by the observer for every event; routes it to on_<event type>."""
+        handler = getattr(self, f"on_{event.event_type}", None)
+        if handler:
+            handler(event)
 
     def on_modified(self, event):
-        if not event.is_directory and (time.time() - self.last_triggered > 1.5):
-            if event.src_path.endswith((".py", ".md")):
-                self.last_triggered = time.time()
-                threading.Thread(target=self.controller.handle_file_analysis, args=(event.src_path,), daemon=True).start()
+        if not event.is_directory:
+            self.pipeline.submit(event.src_path)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.pipeline.submit(event.src_path)
+
+    def on_moved(self, event):
+        # Editors that save atomically write a temp file and rename it over the original.
+        if not event.is_directory:
+            self.pipeline.forget(event.src_path)
+            if self.index:
+                self.index.remove_file(event.src_path)
+            self.pipeline.submit(event.dest_path)
+        else:
+            self._refresh_index()
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.pipeline.forget(event.src_path)
+            if self.index:
+                self.index.remove_file(event.src_path)
+        else:
+            self._refresh_index()
+
+    def _refresh_index(self):
+        """Whole directories moving only produce one event; re-scan (unchanged files are skipped)."""
+        if self.index:
+            threading.Thread(target=self.index.refresh, daemon=True).start()
 
 if __name__ == "__main__":
-    app = MainApplication()
+    app = MainApplication(profile_startup="--profile-startup" in sys.argv[1:])
     app.run()
+    sys.exit(app.exit_code)
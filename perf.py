@@ -0,0 +1,113 @@
+# perf.py
+# This module records timing spans for each pipeline stage in a bounded in-memory ring buffer.
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+MAX_SPANS = 5000
+
+_spans = deque(maxlen=MAX_SPANS)
+_export_lock = threading.Lock()
+
+
+@contextmanager
+def span(stage: str, **attrs):
+    """
+    Times the enclosed block as one span of `stage`. The yielded dict can be
+    filled with extra attributes (bytes, tokens, retries, ...) inside the block.
+    """
+    start_wall = time.time()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        if error:
+            attrs["error"] = error
+        record(stage, time.perf_counter() - start, start_wall, **attrs)
+
+
+def record(stage: str, duration: float, start: float = None, **attrs):
+    """Adds a finished span; deque.append is atomic, so no lock is needed on the hot path."""
+    _spans.append((stage, start if start is not None else time.time() - duration, duration, attrs))
+
+
+def spans() -> list:
+    return [
+        {"stage": stage, "start": start, "duration_ms": round(duration * 1000, 3), **attrs}
+        for stage, start, duration, attrs in list(_spans)
+    ]
+
+
+def clear():
+    _spans.clear()
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def stage_stats() -> dict:
+    """
+    Returns {stage: {"count", "p50_ms", "p95_ms", "max_ms"}} over the buffered spans.
+    """
+    durations = {}
+    for stage, _, duration, _ in list(_spans):
+        durations.setdefault(stage, []).append(duration * 1000)
+    stats = {}
+    for stage, values in sorted(durations.items()):
+        values.sort()
+        stats[stage] = {
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 0.50), 1),
+            "p95_ms": round(_percentile(values, 0.95), 1),
+            "max_ms": round(values[-1], 1),
+        }
+    return stats
+
+
+def context_savings() -> dict:
+    """
+    Sums the `context.pack` spans: {"prompts", "tokens_saved", "last_tokens", "last_saved"},
+    or an empty dict if no prompt was packed yet.
+    """
+    packs = [attrs for stage, _, _, attrs in list(_spans) if stage == "context.pack" and "tokens" in attrs]
+    if not packs:
+        return {}
+    return {
+        "prompts": len(packs),
+        "tokens_saved": sum(attrs["tokens_saved"] for attrs in packs),
+        "last_tokens": packs[-1]["tokens"],
+        "last_saved": packs[-1]["tokens_saved"],
+    }
+
+
+def format_stats() -> str:
+    stats = stage_stats()
+    if not stats:
+        return "No timings recorded yet. Analyse some code to see where the time goes."
+    lines = [f"{'Stage':<24}{'Count':>8}{'p50 ms':>12}{'p95 ms':>12}{'max ms':>12}", "-" * 68]
+    for stage, row in stats.items():
+        lines.append(f"{stage:<24}{row['count']:>8}{row['p50_ms']:>12}{row['p95_ms']:>12}{row['max_ms']:>12}")
+    savings = context_savings()
+    if savings:
+        lines += ["", f"Context packing saved {savings['tokens_saved']} prompt tokens over {savings['prompts']} "
+                      f"prompts; the last one sent {savings['last_tokens']} tokens "
+                      f"({savings['last_saved']} saved)."]
+    return "\n".join(lines)
+
+
+def export_jsonl(path: str) -> int:
+    """Writes every buffered span to `path` as JSON lines, replacing the file; returns how many were written."""
+    rows = spans()
+    with _export_lock, open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str) + "\n")
+    return len(rows)
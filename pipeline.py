@@ -0,0 +1,112 @@
+# pipeline.py
+# This module runs analysis stages as a small dependency graph on a shared executor.
+
+import threading
+
+
+class Stage:
+    """
+    One unit of work in an analysis. `func` is called with the results of the
+    stages named in `deps` (in order); `on_done` receives this stage's result as
+    soon as it is available, before the rest of the graph has finished.
+    """
+
+    def __init__(self, name, func, deps=(), on_done=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.on_done = on_done
+
+
+def run_stages(stages, executor) -> dict:
+    """
+    Runs the stages on `executor`, starting each one as soon as its dependencies
+    have finished, and blocks until the whole graph is done. Returns a mapping of
+    stage name to result. If a stage raises, its dependents are skipped and the
+    first exception is re-raised once the remaining stages have settled.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {', '.join(missing)}")
+    _check_acyclic(stages)
+
+    results = {}
+    errors = []
+    pending = {stage.name: set(stage.deps) for stage in stages}
+    remaining = len(stages)
+    lock = threading.Lock()
+    finished = threading.Event()
+
+    def settle(names):
+        nonlocal remaining
+        remaining -= len(names)
+        if remaining == 0:
+            finished.set()
+
+    def skip_dependents(name):
+        skipped = []
+        queue = [name]
+        while queue:
+            current = queue.pop()
+            for other, deps in list(pending.items()):
+                if current in by_name[other].deps:
+                    del pending[other]
+                    skipped.append(other)
+                    queue.append(other)
+        return skipped
+
+    def run(stage):
+        try:
+            result = stage.func(*[results[dep] for dep in stage.deps])
+            if stage.on_done:
+                stage.on_done(result)
+        except BaseException as e:
+            with lock:
+                errors.append(e)
+                settle([stage.name] + skip_dependents(stage.name))
+            return
+
+        ready = []
+        with lock:
+            results[stage.name] = result
+            for other, deps in pending.items():
+                deps.discard(stage.name)
+                if not deps:
+                    ready.append(other)
+            for other in ready:
+                del pending[other]
+            settle([stage.name])
+        for other in ready:
+            executor.submit(run, by_name[other])
+
+    with lock:
+        initial = [name for name, deps in pending.items() if not deps]
+        for name in initial:
+            del pending[name]
+    if not stages:
+        return results
+    for name in initial:
+        executor.submit(run, by_name[name])
+
+    finished.wait()
+    if errors:
+        raise errors[0]
+    return results
+
+
+def _check_acyclic(stages):
+    indegree = {stage.name: len(stage.deps) for stage in stages}
+    ready = [name for name, count in indegree.items() if count == 0]
+    visited = 0
+    while ready:
+        name = ready.pop()
+        visited += 1
+        for stage in stages:
+            if name in stage.deps:
+                indegree[stage.name] -= 1
+                if indegree[stage.name] == 0:
+                    ready.append(stage.name)
+    if visited != len(stages):
+        raise ValueError("Analysis stages contain a dependency cycle.")
@@ -0,0 +1,282 @@
+# prefetch.py
+# This module pre-analyses the files most likely to be opened next, in the background and within a budget.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import perf
+import prompts
+from analyzer import read_file_content
+from cancellation import Cancelled, CancelToken
+from context_packer import EXPLANATION_BUDGET, SOLUTION_BUDGET
+from incremental import IncrementalAnalysis
+from lint_engine import get_lint_engine
+from response_cache import get_response_cache
+
+PREFETCH_FILES = 5
+# At most this many API requests per hour are spent on files nobody has opened yet.
+API_CALLS_PER_HOUR = 60
+# Local work (parsing, pylint) sleeps between steps to use at most this share of one core.
+CPU_SHARE = 0.25
+# How often a paused prefetcher checks whether the foreground work has finished.
+IDLE_POLL_SECONDS = 0.5
+
+
+def _key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _digest(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class Prefetcher:
+    """
+    A low-priority worker that computes the lint findings and AI explanations of
+    files likely to be opened next and leaves them where a foreground analysis
+    looks first: the per-part result store (Python) and the response cache
+    (Markdown). Opening such a file then shows its results without waiting.
+
+    Candidates are the most recently modified files of the monitored folder;
+    files touched by watch events move to the front. Work is done one step
+    (a lint run or one AI request) at a time, only while `is_busy()` is False,
+    and interrupt() abandons the step in flight when foreground work starts.
+    """
+
+    def __init__(self, is_busy, max_files=PREFETCH_FILES, api_calls_per_hour=API_CALLS_PER_HOUR,
+                 cpu_share=CPU_SHARE):
+        self.is_busy = is_busy
+        self.max_files = max_files
+        self.api_calls_per_hour = api_calls_per_hour
+        self.cpu_share = cpu_share
+        self.stats = {"prefetched": 0, "hits": 0, "misses": 0, "api_calls": 0, "cpu_seconds": 0.0,
+                      "wasted_files": 0, "wasted_api_calls": 0, "wasted_cpu_seconds": 0.0}
+        self._cond = threading.Condition()
+        self._queue = OrderedDict()  # key -> path, most likely to be opened first
+        self._ready = {}             # key -> (content digest, api calls, cpu seconds)
+        self._calls = deque()        # monotonic times of the API requests of the last hour
+        self._current = None         # (key, token) of the file being prefetched
+        self._spent = {}             # what the current file has cost so far
+        self._stopped = False
+        self._thread = threading.Thread(target=self._worker_loop, name="prefetch", daemon=True)
+        self._thread.start()
+
+    # --- Candidates ---
+
+    def seed(self, paths):
+        """Replaces the candidates with `paths`, most likely first (e.g. newest first)."""
+        with self._cond:
+            self._queue.clear()
+            for path in paths[:self.max_files]:
+                self._queue[_key(path)] = path
+            self._cond.notify()
+
+    def touch(self, path):
+        """A watch event changed `path`: it moves to the front, and an earlier prefetch of it is stale."""
+        key = _key(path)
+        with self._cond:
+            self._waste(key)
+            self._cancel_current(key)
+            self._queue[key] = path
+            self._queue.move_to_end(key, last=False)
+            while len(self._queue) > self.max_files:
+                self._queue.popitem()
+            self._cond.notify()
+
+    def clear(self):
+        """Drops every candidate and ready result, e.g. when another folder is monitored."""
+        with self._cond:
+            self._queue.clear()
+            for key in list(self._ready):
+                self._waste(key)
+        self.interrupt()
+
+    def claim(self, path, content) -> bool:
+        """
+        Called when the user opens `path`. Returns True if its current `content`
+        was prefetched, i.e. the analysis about to run will be served from stored results.
+        """
+        key = _key(path)
+        with self._cond:
+            self._queue.pop(key, None)
+            self._cancel_current(key)
+            ready = self._ready.get(key)
+            hit = ready is not None and ready[0] == _digest(content)
+            if hit:
+                del self._ready[key]
+                self.stats["hits"] += 1
+            else:
+                self._waste(key)
+                self.stats["misses"] += 1
+        return hit
+
+    def _cancel_current(self, key):
+        # Caller holds self._cond. The file's content changed or the foreground now owns it.
+        if self._current and self._current[0] == key:
+            self._current[1].cancel()
+
+    def _waste(self, key):
+        # Caller holds self._cond.
+        ready = self._ready.pop(key, None)
+        if ready:
+            self.stats["wasted_files"] += 1
+            self.stats["wasted_api_calls"] += ready[1]
+            self.stats["wasted_cpu_seconds"] += ready[2]
+
+    # --- Control ---
+
+    def interrupt(self):
+        """Abandons the step in flight; its file is retried later, reusing what was already stored."""
+        with self._cond:
+            current = self._current
+        if current:
+            current[1].cancel()
+        with self._cond:
+            self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self.interrupt()
+
+    def summary(self) -> dict:
+        with self._cond:
+            stats = dict(self.stats, queued=len(self._queue), ready=len(self._ready))
+        opened = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / opened if opened else 0.0
+        return stats
+
+    def format_stats(self) -> str:
+        stats = self.summary()
+        return (f"Prefetch: {stats['hits']} of {stats['hits'] + stats['misses']} opened files were ready "
+                f"(hit rate {stats['hit_rate']:.0%}); {stats['prefetched']} prefetched, {stats['ready']} ready, "
+                f"{stats['queued']} queued.\n"
+                f"Spent {stats['api_calls']} API calls and {stats['cpu_seconds']:.1f}s of local CPU; "
+                f"wasted on files changed or never opened: {stats['wasted_files']} files, "
+                f"{stats['wasted_api_calls']} API calls, {stats['wasted_cpu_seconds']:.1f}s.")
+
+    # --- Worker ---
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._queue:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+            if self.is_busy():
+                self._sleep(IDLE_POLL_SECONDS)
+                continue
+            with self._cond:
+                if not self._queue:
+                    continue
+                key, path = next(iter(self._queue.items()))
+                token = CancelToken()
+                self._current = (key, token)
+            try:
+                self._prefetch(token, key, path)
+            except Cancelled:
+                continue  # Still queued; retried once the foreground is idle.
+            except Exception as e:
+                print(f"Prefetch of {path} failed: {e}")
+            finally:
+                with self._cond:
+                    self._current = None
+            with self._cond:
+                if self._queue.get(key) == path:
+                    del self._queue[key]
+
+    def _sleep(self, seconds, token=None):
+        deadline = time.monotonic() + seconds
+        with self._cond:
+            while not self._stopped and not (token and token.cancelled):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._cond.wait(remaining)
+
+    def _prefetch(self, token, key, path):
+        with perf.span("prefetch.file") as attrs:
+            self._spent = {"api_calls": 0, "cpu_seconds": 0.0}
+            content = self._local_step(token, read_file_content, path)
+            if not content.strip() or content.startswith("Error reading file:"):
+                return
+            if path.endswith(".py"):
+                complete = self._prefetch_python(token, content)
+            elif get_response_cache() is not None:
+                # The streamed foreground request is answered from the cache entry this leaves.
+                complete = self._query(token, prompts.markdown_task_prompt(content)) is not None
+            else:
+                complete = False
+            attrs.update(self._spent, complete=complete)
+            if not complete:
+                return
+            with self._cond:
+                self._ready[key] = (_digest(content), self._spent["api_calls"], self._spent["cpu_seconds"])
+                self.stats["prefetched"] += 1
+
+    def _prefetch_python(self, token, content):
+        """The same steps as a foreground analysis, with nothing displayed; True if all results are stored."""
+        try:
+            analysis = self._local_step(token, IncrementalAnalysis, content)
+        except SyntaxError:
+            return False  # Analysed as a whole when opened; nothing per-part to store.
+        # Not cancellable: killing the warm pylint worker would cost the foreground more than waiting.
+        lint_result = self._local_step(token, analysis.lint, get_lint_engine().lint_source)
+        if lint_result.error:
+            return False
+        steps = [(analysis.explanation_batches(EXPLANATION_BUDGET), analysis.store_explanations)]
+        if not lint_result.is_clean:
+            steps.append((analysis.solution_batches(SOLUTION_BUDGET), analysis.store_solutions))
+        for batches, store in steps:
+            for parts, prompt in batches:
+                answer = self._query(token, prompt)
+                if answer is None:
+                    return False
+                store(parts, answer)
+        return True
+
+    def _may_continue(self, token):
+        """Raises Cancelled if the step was interrupted or foreground work started since the last step."""
+        token.raise_if_cancelled()
+        if self.is_busy():
+            raise Cancelled()
+
+    def _local_step(self, token, func, *args):
+        """Runs one CPU-bound step, then sleeps so the prefetcher stays within its CPU share."""
+        self._may_continue(token)
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        self._spent["cpu_seconds"] += elapsed
+        with self._cond:
+            self.stats["cpu_seconds"] += elapsed
+        self._sleep(elapsed * (1 - self.cpu_share) / self.cpu_share, token)
+        token.raise_if_cancelled()
+        return result
+
+    def _query(self, token, prompt):
+        """Sends one request within the hourly API budget; None if the answer is an error."""
+        from gemini_client import is_error_answer, query_gemini
+
+        while True:
+            self._may_continue(token)
+            with self._cond:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] > 3600:
+                    self._calls.popleft()
+                wait = 3600 - (now - self._calls[0]) if len(self._calls) >= self.api_calls_per_hour else 0
+                if not wait:
+                    self._calls.append(now)
+                    self.stats["api_calls"] += 1
+                    break
+            self._sleep(wait, token)
+            if self._stopped:
+                raise Cancelled()
+        self._spent["api_calls"] += 1
+        answer = query_gemini(prompt, cancel_token=token)
+        return None if is_error_answer(answer) else answer
@@ -0,0 +1,71 @@
+# prompts.py
+# This module builds the prompts sent to Gemini, shared by the GUI and the batch analyzer
+# so that both produce identical prompts (and therefore share response-cache entries).
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count used for budgets and rate limiting (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def explanation_prompt(content: str) -> str:
+    return (
+        f"Please analyze the following Python code and provide three things:\n"
+        f"1. A clear explanation of the code's logic and purpose.\n"
+        f"2. Suggestions for alternative methods or approaches to achieve the same result.\n"
+        f"3. Potential optimizations or improvements.\n\n"
+        f"--- PYTHON CODE ---\n{content}"
+    )
+
+
+def lint_solution_prompt(pylint_errors: str, content: str) -> str:
+    return (
+        f"The Python code below has these pylint errors:\n\n"
+        f"--- DETECTED ERRORS ---\n{pylint_errors}\n\n"
+        f"--- PYTHON CODE ---\n{content}\n\n"
+        f"Please explain these errors in simple terms and provide the corrected, complete code snippet."
+    )
+
+
+def markdown_task_prompt(content: str) -> str:
+    return f"Break down the task in this Markdown:\n\n---\n\n{content}"
+
+
+def code_generation_prompt(question: str) -> str:
+    return f"Generate a Python code snippet for the following request: '{question}'. Provide only the code, without any explanation before or after."
+
+
+def question_prompt(question: str, context: str) -> str:
+    return f"Context:\n---\n{context}\n---\n\nQuestion: '{question}'\n\nAnswer:"
+
+
+def _numbered_parts(items, with_errors=False) -> str:
+    sections = []
+    for number, (label, code, errors) in enumerate(items, start=1):
+        section = f"--- PART [{number}]: {label} ---\n{code}"
+        if with_errors:
+            section += f"\n--- PYLINT ERRORS IN PART [{number}] (line numbers count from the part's first line) ---\n{errors}"
+        sections.append(section)
+    return "\n\n".join(sections)
+
+
+def parts_explanation_prompt(items) -> str:
+    """`items` are (label, code, errors) tuples for parts of one Python module."""
+    return (
+        f"Please analyze each of the following parts of a Python module and provide three things for each:\n"
+        f"1. A clear explanation of the code's logic and purpose.\n"
+        f"2. Suggestions for alternative methods or approaches to achieve the same result.\n"
+        f"3. Potential optimizations or improvements.\n"
+        f"Start the answer for each part with a line containing only '### [n]', where n is the part number.\n\n"
+        f"{_numbered_parts(items)}"
+    )
+
+
+def parts_solution_prompt(items) -> str:
+    """`items` are (label, code, errors) tuples for parts of one Python module."""
+    return (
+        f"Each part of a Python module below is followed by the pylint errors found in it.\n"
+        f"For each part, explain these errors in simple terms and provide the corrected code for that part.\n"
+        f"Start the answer for each part with a line containing only '### [n]', where n is the part number.\n\n"
+        f"{_numbered_parts(items, with_errors=True)}"
+    )
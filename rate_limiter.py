@@ -0,0 +1,87 @@
+# rate_limiter.py
+# This module provides token-bucket rate limiting shared by threaded and asyncio callers.
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    A classic token bucket refilled continuously at `rate_per_minute`.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill(now)
+        # Requests larger than the bucket are allowed once it is full, or they would never run.
+        amount = min(amount, self.capacity)
+        if self._tokens >= amount:
+            return 0.0
+        return (amount - self._tokens) / self.rate
+
+    def take(self, amount: float):
+        self._tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Limits requests per minute and tokens per minute. One instance can be
+    shared by any number of threads and event loops; it also honours
+    server-requested pauses (Retry-After) for every caller at once.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+
+    def _reserve(self, tokens: int) -> float:
+        """Takes capacity and returns 0, or returns how long to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self._paused_until - now,
+                self._requests.wait_time(1, now),
+                self._tokens.wait_time(tokens, now),
+            )
+            if wait <= 0:
+                self._requests.take(1)
+                self._tokens.take(tokens)
+                return 0.0
+            return wait
+
+    def acquire(self, tokens: int = 0, cancel_token=None):
+        """Blocks until a request of `tokens` estimated tokens may be sent."""
+        while True:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            # Sleep in short slices so cancellation stays responsive.
+            time.sleep(min(wait, 0.25))
+
+    async def acquire_async(self, tokens: int = 0):
+        """The asyncio counterpart of acquire(); never blocks the event loop."""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Holds back every caller for `seconds`, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,83 @@
+# scheduler.py
+# This module schedules analyses so that only the newest version of each buffer or file is analysed.
+
+import threading
+
+from cancellation import Cancelled, CancelToken
+
+
+class AnalysisScheduler:
+    """
+    Latest-wins scheduler keyed by editor buffer or file path.
+
+    If a job for the submitted key is already running it is cancelled, and the
+    new job waits in a single pending slot that is overwritten by any newer
+    submission, so bursts of edits collapse into one run of the newest content.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._running = {}
+        self._pending = {}
+
+    def submit(self, key, func, *args):
+        """Schedules func(token, *args) for `key`."""
+        with self._lock:
+            job = (func, args)
+            if key in self._running:
+                self._pending[key] = job
+                self._running[key].cancel()
+            else:
+                self._start(key, job)
+
+    def is_busy(self) -> bool:
+        with self._lock:
+            return bool(self._running)
+
+    def wait_idle(self, key, timeout=None) -> bool:
+        """Blocks until no job for `key` is running or pending; False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: key not in self._running and key not in self._pending, timeout
+            )
+
+    def cancel_others(self, key, keep=()):
+        """Cancels the running and pending jobs of every key except `key` and those in `keep`."""
+        with self._lock:
+            others = [k for k in set(self._running) | set(self._pending) if k != key and k not in keep]
+            for other in others:
+                self._pending.pop(other, None)
+            running = [self._running[k] for k in others if k in self._running]
+        for token in running:
+            token.cancel()
+
+    def cancel_all(self):
+        with self._lock:
+            self._pending.clear()
+            running = list(self._running.values())
+        for token in running:
+            token.cancel()
+
+    def _start(self, key, job):
+        # Caller holds self._lock.
+        func, args = job
+        token = CancelToken()
+        self._running[key] = token
+        threading.Thread(target=self._run, args=(key, token, func, args), daemon=True).start()
+
+    def _run(self, key, token, func, args):
+        try:
+            func(token, *args)
+        except Cancelled:
+            pass
+        except Exception as e:
+            print(f"Analysis for {key} failed: {e}")
+        finally:
+            with self._lock:
+                del self._running[key]
+                job = self._pending.pop(key, None)
+                if job is not None:
+                    self._start(key, job)
+                else:
+                    self._idle.notify_all()
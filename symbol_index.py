@@ -0,0 +1,376 @@
+# symbol_index.py
+# This module keeps a searchable index of the definitions, references and docstrings in the monitored folder.
+
+import ast
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+
+import perf
+from prompts import estimate_tokens
+from watch_pipeline import DEFAULT_EXTENSIONS, DEFAULT_IGNORE_GLOBS, is_ignored
+
+INDEX_DIR = os.path.join(os.path.expanduser("~"), ".code_mitra", "index")
+INDEX_VERSION = 1
+PROJECT_CONTEXT_BUDGET = 3000
+MAX_INDEXED_BYTES = 1024 * 1024
+MAX_SNIPPET_LINES = 80
+# BM25 parameters, and how much more a match in a name or docstring counts than one in the body.
+BM25_K1 = 1.2
+BM25_B = 0.75
+NAME_WEIGHT = 3
+DOC_WEIGHT = 2
+
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have how i if in is it its my of on or so that the this
+to was what when where which who why with does do can should would could there their them then
+self cls def class return import none true false not else elif pass
+""".split())
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CAMEL = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize(text: str) -> list:
+    """
+    Lower-cased search terms: whole identifiers plus their snake_case and
+    CamelCase pieces, so "retry" finds parse_retry_after and RetryPolicy.
+    """
+    terms = []
+    for word in _WORD.findall(text):
+        lower = word.lower()
+        pieces = [p.lower() for chunk in word.split("_") for p in _CAMEL.findall(chunk)]
+        for term in [lower] + (pieces if len(pieces) > 1 else []):
+            if len(term) > 1 and term not in STOP_WORDS:
+                terms.append(term)
+    return terms
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A searchable piece of a file: a function, class, module header or Markdown section."""
+    path: str
+    name: str
+    kind: str
+    start: int
+    end: int
+    length: int
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    chunk: Chunk
+    score: float
+
+
+def _python_chunks(source, module_name):
+    """Yields (name, kind, start, end, Counter of weighted terms) for one Python file."""
+    tree = ast.parse(source)
+    docstring = ast.get_docstring(tree) or ""
+    header = Counter(tokenize(module_name) * NAME_WEIGHT + tokenize(docstring) * DOC_WEIGHT)
+    header_end = 1
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        header_end = max(header_end, node.end_lineno)
+        header.update(tokenize(ast.unparse(node)) if isinstance(node, (ast.Import, ast.ImportFrom)) else
+                      [t for n in ast.walk(node) if isinstance(n, ast.Name) for t in tokenize(n.id)])
+    yield module_name, "module", 1, header_end, header
+
+    stack = [(node, "") for node in reversed(tree.body)]
+    while stack:
+        node, prefix = stack.pop()
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        name = f"{prefix}{node.name}"
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        terms = Counter(tokenize(name) * NAME_WEIGHT + tokenize(ast.get_docstring(node) or "") * DOC_WEIGHT)
+        if isinstance(node, ast.ClassDef):
+            kind = "class"
+            terms.update(t for base in node.bases for t in tokenize(ast.unparse(base)))
+            # Methods are chunks of their own; the class keeps only their names.
+            terms.update(t for child in node.body
+                         if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) for t in tokenize(child.name))
+        else:
+            kind = "function"
+            terms.update(t for arg in ast.walk(node.args) if isinstance(arg, ast.arg) for t in tokenize(arg.arg))
+            # References: every name and attribute the body uses.
+            for child in ast.walk(node):
+                if isinstance(child, ast.Name):
+                    terms.update(tokenize(child.id))
+                elif isinstance(child, ast.Attribute):
+                    terms.update(tokenize(child.attr))
+        yield name, kind, start, node.end_lineno, terms
+        stack.extend((child, f"{name}.") for child in reversed(node.body))
+
+
+def _markdown_chunks(source, title):
+    lines = source.splitlines()
+    sections, heading, start = [], title, 1
+    for number, line in enumerate(lines, start=1):
+        if line.startswith("#") and number > start:
+            sections.append((heading, start, number - 1))
+            heading, start = line.lstrip("#").strip() or title, number
+        elif line.startswith("#"):
+            heading = line.lstrip("#").strip() or title
+    sections.append((heading, start, max(start, len(lines))))
+    for heading, start, end in sections:
+        body = "\n".join(lines[start - 1:end])
+        yield heading, "section", start, end, Counter(tokenize(heading) * NAME_WEIGHT + tokenize(body))
+
+
+def extract_chunks(path, source):
+    """Returns [(name, kind, start, end, terms)] for a file; an empty list if it cannot be parsed."""
+    base = os.path.splitext(os.path.basename(path))[0]
+    try:
+        if path.endswith(".py"):
+            return list(_python_chunks(source, base))
+        return list(_markdown_chunks(source, base))
+    except (SyntaxError, ValueError, RecursionError):
+        return []
+
+
+class SymbolIndex:
+    """
+    An in-memory BM25 index over the chunks of every Python and Markdown file
+    below `root`. Files are added, replaced and removed one at a time, so watch
+    events keep it current without rebuilds; save()/load() persist it between runs.
+    """
+
+    def __init__(self, root, ignore_globs=DEFAULT_IGNORE_GLOBS, extensions=DEFAULT_EXTENSIONS, index_path=None):
+        self.root = os.path.abspath(root)
+        self.ignore_globs = tuple(ignore_globs)
+        self.extensions = tuple(extensions)
+        if index_path is None:
+            digest = hashlib.sha256(self.root.encode("utf-8")).hexdigest()[:16]
+            index_path = os.path.join(INDEX_DIR, f"{digest}.json")
+        self.index_path = index_path
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._files = {}      # path -> {"mtime", "size", "chunks": [(name, kind, start, end, {term: tf})]}
+        self._chunks = {}     # chunk id -> Chunk
+        self._by_file = {}    # path -> [chunk ids]
+        self._postings = {}   # term -> {chunk id: tf}
+        self._definitions = {}  # lower-cased short name -> set of chunk ids
+        self._next_id = 0
+        self._total_length = 0
+        self._dirty = False
+
+    # --- Maintenance ---
+
+    def wants(self, path) -> bool:
+        relative = os.path.relpath(path, self.root)
+        return path.endswith(self.extensions) and not relative.startswith("..") \
+            and not is_ignored(relative, self.ignore_globs)
+
+    def update_file(self, path) -> bool:
+        """(Re-)indexes one file; returns False if it was skipped or could not be read."""
+        path = os.path.abspath(path)
+        if not self.wants(path):
+            return False
+        try:
+            stat = os.stat(path)
+            if stat.st_size > MAX_INDEXED_BYTES:
+                self.remove_file(path)
+                return False
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                source = f.read()
+        except OSError:
+            self.remove_file(path)
+            return False
+        chunks = [(name, kind, start, end, dict(terms)) for name, kind, start, end, terms in extract_chunks(path, source)]
+        with self._lock:
+            self._remove(path)
+            self._add(path, {"mtime": stat.st_mtime, "size": stat.st_size, "chunks": chunks})
+            self._dirty = True
+        return True
+
+    def remove_file(self, path):
+        with self._lock:
+            if self._remove(os.path.abspath(path)):
+                self._dirty = True
+
+    def _add(self, path, record):
+        self._files[path] = record
+        ids = []
+        for name, kind, start, end, terms in record["chunks"]:
+            chunk_id = self._next_id
+            self._next_id += 1
+            length = sum(terms.values())
+            self._chunks[chunk_id] = Chunk(path, name, kind, start, end, length)
+            self._total_length += length
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[chunk_id] = tf
+            self._definitions.setdefault(name.rsplit(".", 1)[-1].lower(), set()).add(chunk_id)
+            ids.append(chunk_id)
+        self._by_file[path] = ids
+
+    def _remove(self, path):
+        record = self._files.pop(path, None)
+        if record is None:
+            return False
+        for chunk_id, (name, _, _, _, terms) in zip(self._by_file.pop(path), record["chunks"]):
+            chunk = self._chunks.pop(chunk_id)
+            self._total_length -= chunk.length
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(chunk_id, None)
+                    if not postings:
+                        del self._postings[term]
+            short = name.rsplit(".", 1)[-1].lower()
+            self._definitions.get(short, set()).discard(chunk_id)
+        return True
+
+    def refresh(self, cancel_token=None) -> int:
+        """
+        Walks the folder and re-indexes only files that are new or whose size or
+        modification time changed since they were indexed; drops files that are gone.
+        Returns the number of files (re-)indexed.
+        """
+        with perf.span("index.refresh") as attrs:
+            seen, updated = set(), 0
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                if cancel_token is not None and cancel_token.cancelled:
+                    return updated
+                relative_dir = os.path.relpath(dirpath, self.root)
+                dirnames[:] = [d for d in dirnames
+                               if not is_ignored(os.path.normpath(os.path.join(relative_dir, d)), self.ignore_globs)]
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    if not self.wants(path):
+                        continue
+                    seen.add(path)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    with self._lock:
+                        record = self._files.get(path)
+                    if record and record["mtime"] == stat.st_mtime and record["size"] == stat.st_size:
+                        continue
+                    if self.update_file(path):
+                        updated += 1
+            with self._lock:
+                for path in [p for p in self._files if p not in seen]:
+                    self._remove(path)
+                    self._dirty = True
+            attrs.update(files=len(seen), updated=updated)
+        return updated
+
+    # --- Persistence ---
+
+    def load(self) -> bool:
+        """Loads the saved index for this folder; False if there is none or it is unusable."""
+        try:
+            with perf.span("index.load"), open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.root:
+            return False
+        with self._lock:
+            for path, record in data["files"].items():
+                record["chunks"] = [tuple(chunk) for chunk in record["chunks"]]
+                self._remove(path)
+                self._add(path, record)
+            self._dirty = False
+        return True
+
+    def save(self, force=False):
+        """Writes the index next to the response cache (only if it changed)."""
+        with self._lock:
+            if not (self._dirty or force):
+                return
+            data = {"version": INDEX_VERSION, "root": self.root, "files": dict(self._files)}
+            self._dirty = False
+        with self._save_lock, perf.span("index.save", files=len(data["files"])):
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            temp_path = self.index_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp_path, self.index_path)
+
+    # --- Queries ---
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"files": len(self._files), "chunks": len(self._chunks), "terms": len(self._postings)}
+
+    def recent_files(self, count: int) -> list:
+        """The `count` most recently modified indexed files, newest first."""
+        with self._lock:
+            return sorted(self._files, key=lambda path: self._files[path]["mtime"], reverse=True)[:count]
+
+    def lookup(self, name) -> list:
+        """Definitions whose (unqualified) name is `name`, case-insensitively."""
+        with self._lock:
+            return [self._chunks[i] for i in self._definitions.get(name.lower(), ()) if i in self._chunks]
+
+    def search(self, query: str, k: int = 5, exclude_paths=()) -> list:
+        """Returns the top `k` chunks for `query` by BM25 score."""
+        terms = set(tokenize(query))
+        exclude = {os.path.abspath(p) for p in exclude_paths}
+        with perf.span("index.search", terms=len(terms)) as attrs, self._lock:
+            count = len(self._chunks)
+            if not count or not terms:
+                return []
+            average = self._total_length / count
+            scores = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    length = self._chunks[chunk_id].length
+                    norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average))
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * norm
+            ranked = sorted(scores.items(), key=lambda item: -item[1])
+            hits = []
+            for chunk_id, score in ranked:
+                chunk = self._chunks[chunk_id]
+                if chunk.path in exclude:
+                    continue
+                hits.append(SearchHit(chunk, score))
+                if len(hits) == k:
+                    break
+            attrs["candidates"] = len(scores)
+        return hits
+
+    def context_for(self, question: str, budget_tokens=PROJECT_CONTEXT_BUDGET, k=8, exclude_paths=()) -> str:
+        """
+        The most relevant snippets for a question, best first, trimmed to fit
+        `budget_tokens`. Returns "" when nothing in the folder matches.
+        """
+        parts, remaining = [], budget_tokens
+        for hit in self.search(question, k=k, exclude_paths=exclude_paths):
+            snippet = self._snippet(hit.chunk)
+            if not snippet:
+                continue
+            cost = estimate_tokens(snippet)
+            if cost > remaining:
+                if parts:
+                    continue
+                snippet = snippet[:remaining * 4] + "\n# ... (truncated)"
+                cost = remaining
+            parts.append(snippet)
+            remaining -= cost
+            if remaining <= 0:
+                break
+        return "\n\n".join(parts)
+
+    def _snippet(self, chunk):
+        try:
+            with open(chunk.path, "r", encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()[chunk.start - 1:chunk.end]
+        except OSError:
+            return ""
+        if len(lines) > MAX_SNIPPET_LINES:
+            lines = lines[:MAX_SNIPPET_LINES] + ["# ... (truncated)"]
+        relative = os.path.relpath(chunk.path, self.root)
+        return f"# {relative}:{chunk.start}-{chunk.end} ({chunk.kind} {chunk.name})\n" + "\n".join(lines)
@@ -0,0 +1,110 @@
+# tests/test_analyzer.py
+
+import textwrap
+
+from analyzer import fast_check
+
+
+def symbols(source):
+    return [(m.line, m.symbol) for m in fast_check(textwrap.dedent(source)).messages]
+
+
+def test_syntax_error_stops_further_checks():
+    assert symbols("x = (\nundefined\n") == [(1, "syntax-error")]
+
+
+def test_undefined_unused_reimport_and_redefinition():
+    source = """
+        import os
+        import sys
+        import sys
+
+        def f():
+            return missing
+
+        def f():
+            return 1
+    """
+    assert sorted(symbols(source)) == [(2, "unused-import"), (3, "unused-import"), (4, "reimported"),
+                                       (4, "unused-import"), (7, "undefined-variable"), (9, "function-redefined")]
+
+
+def test_globals_defined_later_and_builtins_resolve():
+    source = """
+        def f():
+            return helper() + len(__name__)
+
+        def helper():
+            return 1
+    """
+    assert symbols(source) == []
+
+
+def test_class_body_is_not_visible_from_methods():
+    source = """
+        class A:
+            size = 1
+
+            def f(self):
+                return size
+    """
+    assert symbols(source) == [(6, "undefined-variable")]
+
+
+def test_comprehension_and_walrus_scopes():
+    source = """
+        class A:
+            names = ["a"]
+            upper = [n.upper() for n in names]
+
+        def f(values):
+            if any((found := v) for v in values):
+                return found
+    """
+    assert symbols(source) == []
+
+
+def test_imports_used_only_in_string_annotations_are_used():
+    source = """
+        import decimal
+        import fractions
+        from typing import Literal
+
+        def f(x: "decimal.Decimal") -> "Literal['a b']":
+            y: "fractions.Fraction" = x
+            return y
+    """
+    assert symbols(source) == []
+
+
+def test_names_in_string_annotations_are_not_reported_undefined():
+    assert symbols('def f(x: "NotYetDefined") -> None:\n    return x\n') == []
+
+
+def test_dunder_all_star_import_and_future_imports():
+    assert symbols('from __future__ import annotations\nimport os\n__all__ = ["os"]\n') == []
+    # A star import could bind anything, so undefined names are not reported.
+    assert symbols("from os.path import *\nprint(join)\n") == []
+
+
+def test_overloads_and_conditional_definitions_are_not_redefinitions():
+    source = """
+        from typing import overload
+
+        @overload
+        def f(x: int) -> int: ...
+        def f(x):
+            return x
+
+        try:
+            import json
+        except ImportError:
+            json = None
+        print(json)
+    """
+    assert symbols(source) == []
+
+
+def test_severity_separates_blocking_errors_from_warnings():
+    messages = fast_check("import os\nprint(nope)\n").messages
+    assert {m.symbol: m.severity for m in messages} == {"unused-import": "warning", "undefined-variable": "error"}
@@ -0,0 +1,34 @@
+# tests/test_batch_analyze.py
+
+from batch_analyze import analyze_project
+
+
+def test_a_file_that_is_not_utf8_is_reported_and_not_complete(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "latin1.py").write_bytes('name = "café"\n'.encode("latin-1"))
+    (project / "notes.md").write_bytes("# Café\n".encode("latin-1"))
+    (project / "ok.py").write_text('"""Fine."""\n', encoding="utf-8")
+
+    results, stats = analyze_project(str(project), str(tmp_path / "out"), workers=1, use_ai=False,
+                                     log=lambda message: None)
+
+    assert stats["files_analyzed"] == 3
+    for rel_path in ("latin1.py", "notes.md"):
+        assert "codec can't decode" in results[rel_path]["lint_error"]
+        assert results[rel_path]["ai_complete"] is False
+    assert results["latin1.py"]["lint"] == []
+    assert results["ok.py"]["lint_error"] is None
+
+
+def test_unchanged_files_are_skipped_on_the_next_run(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "ok.py").write_text('"""Fine."""\n', encoding="utf-8")
+    out = str(tmp_path / "out")
+
+    analyze_project(str(project), out, workers=1, use_ai=False, log=lambda message: None)
+    _, stats = analyze_project(str(project), out, workers=1, use_ai=False, log=lambda message: None)
+
+    assert stats["files_skipped"] == 1
+    assert stats["files_analyzed"] == 0
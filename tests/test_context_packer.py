@@ -0,0 +1,89 @@
+# tests/test_context_packer.py
+
+import ast
+
+import pytest
+
+import perf
+from context_packer import outline, pack_context, symbols_in_question
+from prompts import estimate_tokens
+
+
+def make_module(functions=60, body_lines=10):
+    parts = ["import os", "", "LIMIT = 3", ""]
+    for i in range(functions):
+        parts.append(f"def func_{i}(value):")
+        parts += [f"    value = value + {j}  # step {j} of func_{i}" for j in range(body_lines)]
+        parts += ["    return value", ""]
+    return "\n".join(parts) + "\n"
+
+
+def line_of(source, text):
+    return source.splitlines().index(text) + 1
+
+
+@pytest.fixture(autouse=True)
+def clean_spans():
+    perf.clear()
+    yield
+    perf.clear()
+
+
+def test_small_sources_are_returned_unchanged():
+    source = "def f():\n    return 1\n"
+    packed = pack_context(source, 1000)
+    assert packed.text == source
+    assert packed.tokens_saved == 0
+
+
+def test_large_sources_fit_the_budget_and_keep_the_reported_function():
+    source = make_module()
+    target = line_of(source, "    value = value + 5  # step 5 of func_42")
+    packed = pack_context(source, 2000, lines=[target])
+    assert packed.tokens <= 2000
+    assert packed.original_tokens == estimate_tokens(source)
+    assert packed.tokens_saved == packed.original_tokens - packed.tokens
+    assert "step 9 of func_42" in packed.text
+    assert "def func_41(value): ..." in packed.text  # Only in the outline.
+    assert "step 0 of func_41" not in packed.text
+
+
+def test_named_symbols_are_included_verbatim():
+    source = make_module()
+    packed = pack_context(source, 500, symbols=["func_7"])
+    assert "step 3 of func_7" in packed.text
+
+
+def test_code_that_does_not_parse_keeps_windows_around_the_lines():
+    source = make_module() + "def broken(:\n"
+    target = line_of(source, "    value = value + 5  # step 5 of func_42")
+    packed = pack_context(source, 500, lines=[target])
+    assert packed.tokens <= 500
+    assert "step 5 of func_42" in packed.text
+
+
+def test_outline_lists_imports_names_and_signatures():
+    text = outline(ast.parse("import os\nX = 1\nclass A(B):\n    def m(self, y) -> int:\n        return y\n"))
+    assert "import os" in text
+    assert "X = ..." in text
+    assert "class A(B):\n    def m(self, y) -> int: ..." in text
+
+
+def test_symbols_in_question_finds_defined_names_only():
+    source = "class Parser:\n    def feed(self):\n        pass\n\ndef helper():\n    pass\n"
+    assert sorted(symbols_in_question("Why does feed call helper and os?", source)) == ["Parser.feed", "helper"]
+    assert symbols_in_question("anything", "def broken(:") == []
+
+
+def test_packing_is_recorded_and_summed_for_the_performance_tab():
+    source = make_module()
+    first = pack_context(source, 500)
+    last = pack_context(source, 800)
+    savings = perf.context_savings()
+    assert savings == {"prompts": 2, "tokens_saved": first.tokens_saved + last.tokens_saved,
+                       "last_tokens": last.tokens, "last_saved": last.tokens_saved}
+    assert f"saved {savings['tokens_saved']} prompt tokens over 2 prompts" in perf.format_stats()
+
+
+def test_no_savings_before_any_prompt_is_packed():
+    assert perf.context_savings() == {}
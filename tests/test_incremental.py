@@ -0,0 +1,85 @@
+# tests/test_incremental.py
+
+from incremental import IncrementalAnalysis, ResultStore, split_parts, split_sections
+from lint_engine import LintMessage, LintResult
+
+SOURCE = "import os\n\n\ndef a():\n    return os.sep\n\n\ndef b():\n    return 2\n\n\ndef c():\n    return 3\n"
+
+
+def analysis(source=SOURCE):
+    return IncrementalAnalysis(source, ResultStore())
+
+
+def test_split_sections_by_marker():
+    answer = "intro\n### [1] a\nfirst\n### [2] b\nsecond\n"
+    assert split_sections(answer, 2) == {1: "first", 2: "second"}
+
+
+def test_split_sections_ignores_out_of_range_numbers():
+    assert split_sections("### [1]\nfirst\n### [9]\nstray\n", 2) == {1: "first"}
+
+
+def test_split_sections_without_usable_markers_goes_to_part_one():
+    assert split_sections("no markers here", 3) == {1: "no markers here"}
+    assert split_sections("### [7]\nfoo", 3) == {1: "### [7]\nfoo"}
+
+
+def test_parts_cover_every_line():
+    _, parts = split_parts(SOURCE)
+    assert [p.label for p in parts] == ["module code", "def a", "def b", "def c"]
+    assert parts[0].start == 1 and parts[-1].end == SOURCE.count("\n")
+    assert all(p.end + 1 == q.start for p, q in zip(parts, parts[1:]))
+
+
+def test_store_explanations_fills_skipped_parts():
+    planned = analysis()
+    parts = planned.parts[1:]
+    planned.store_explanations(parts, "### [2]\nexplains b\n")
+    rendered = planned.render_explanations()
+    assert "explains b" in rendered
+    assert "(Included in the answer for def b.)" in rendered
+
+
+def test_store_explanations_with_only_out_of_range_markers():
+    planned = analysis()
+    planned.store_explanations(planned.parts, "### [7]\nfoo")
+    assert planned.explanation_batches(10_000) == []
+
+
+def test_unchanged_parts_are_reused():
+    store = ResultStore()
+    first = IncrementalAnalysis(SOURCE, store)
+    (parts, _), = first.explanation_batches(10_000)
+    first.store_explanations(parts, "\n".join(f"### [{n}]\ntext {n}" for n in range(1, len(parts) + 1)))
+    edited = IncrementalAnalysis(SOURCE.replace("return 3", "return 4"), store)
+    (todo, _), = edited.explanation_batches(10_000)
+    assert [p.label for p in todo] == ["def c"]
+
+
+def test_lint_reuses_stored_findings_and_shifts_lines():
+    store = ResultStore()
+    calls = []
+
+    def lint(source):
+        calls.append(source)
+        line = source.splitlines().index("    return 3") + 1
+        return LintResult(messages=[LintMessage(line, 4, "some-check", "W9999", "warning", "m")])
+
+    first = IncrementalAnalysis(SOURCE, store).lint(lint)
+    shifted = IncrementalAnalysis("\n\n" + SOURCE, store).lint(lint)
+    assert len(calls) == 2  # Line numbers changed for every part, so all are re-linted once.
+    again = IncrementalAnalysis("\n\n" + SOURCE, store).lint(lint)
+    assert len(calls) == 2
+    assert [m.line for m in first.messages] == [13]
+    assert [m.line for m in shifted.messages] == [m.line for m in again.messages] == [15]
+
+
+def test_solution_prompt_keeps_flagged_lines_of_oversized_parts():
+    methods = "\n".join(f"    def m{i}(self):\n        x = {i}\n        return x\n" for i in range(300))
+    source = "class Big:\n" + methods + "    def bad(self):\n        return undefined_name_here\n"
+    line = source.splitlines().index("        return undefined_name_here") + 1
+    planned = analysis(source)
+    planned.lint(lambda s: LintResult(messages=[
+        LintMessage(line, 15, "undefined-variable", "E0602", "error", "Undefined variable")]))
+    (_, prompt), = planned.solution_batches(500)
+    assert "return undefined_name_here" in prompt
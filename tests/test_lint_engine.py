@@ -0,0 +1,67 @@
+# tests/test_lint_engine.py
+
+import threading
+import time
+
+import pytest
+
+from cancellation import Cancelled, CancelToken
+from lint_engine import LintEngine
+
+SLOW_SOURCE = "\n".join(f"def f{i}(a, b):\n    return a + b + {i}\n" for i in range(3000))
+
+
+@pytest.fixture
+def engine():
+    engine = LintEngine(workers=1)
+    yield engine
+    engine.shutdown()
+
+
+def lint_in_thread(engine, source, **kwargs):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = engine.lint_source(source, **kwargs)
+        except Cancelled:
+            outcome["cancelled"] = True
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def test_lints_source_text(engine):
+    result = engine.lint_source("import os\n")
+    assert "unused-import" in [m.symbol for m in result.messages]
+
+
+def test_cancelling_one_caller_does_not_strand_a_waiting_one(engine):
+    engine.warm_up()
+    token = CancelToken()
+    first, first_outcome = lint_in_thread(engine, SLOW_SOURCE, cancel_token=token)
+    time.sleep(0.2)
+    second, second_outcome = lint_in_thread(engine, "x = 1\n")
+    time.sleep(0.2)
+    token.cancel()  # Kills the only worker while the second caller waits for it.
+    first.join(10)
+    second.join(60)
+    assert first_outcome == {"cancelled": True}
+    assert second_outcome["result"].error is None
+
+
+def test_a_timed_out_worker_is_replaced_for_waiting_callers(engine):
+    engine.warm_up()
+    first, first_outcome = lint_in_thread(engine, SLOW_SOURCE, timeout=0.3)
+    time.sleep(0.1)
+    second, second_outcome = lint_in_thread(engine, "x = 1\n")
+    first.join(10)
+    second.join(60)
+    assert "timed out" in first_outcome["result"].error
+    assert second_outcome["result"].error is None
+
+
+def test_shutdown_rejects_new_work(engine):
+    engine.shutdown()
+    assert "shut down" in engine.lint_source("x = 1\n").error
@@ -0,0 +1,58 @@
+# tests/test_pipeline.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pipeline import Stage, run_stages
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def test_results_flow_along_dependencies(executor):
+    results = run_stages([
+        Stage("a", lambda: 1),
+        Stage("b", lambda: 2),
+        Stage("sum", lambda a, b: a + b, deps=["a", "b"]),
+    ], executor)
+    assert results == {"a": 1, "b": 2, "sum": 3}
+
+
+def test_independent_stages_overlap(executor):
+    barrier = threading.Barrier(2, timeout=5)
+    results = run_stages([Stage("x", barrier.wait), Stage("y", barrier.wait)], executor)
+    assert set(results) == {"x", "y"}
+
+
+def test_failure_skips_dependents_and_is_reraised(executor):
+    ran = []
+
+    def fail():
+        raise RuntimeError("lint failed")
+
+    with pytest.raises(RuntimeError, match="lint failed"):
+        run_stages([
+            Stage("lint", fail),
+            Stage("solution", lambda _: ran.append("solution"), deps=["lint"]),
+            Stage("explanation", lambda: ran.append("explanation")),
+        ], executor)
+    assert ran == ["explanation"]
+
+
+def test_on_done_sees_each_result(executor):
+    seen = []
+    run_stages([Stage("a", lambda: 5, on_done=seen.append)], executor)
+    assert seen == [5]
+
+
+def test_invalid_graphs_are_rejected(executor):
+    with pytest.raises(ValueError, match="unknown"):
+        run_stages([Stage("a", lambda x: x, deps=["missing"])], executor)
+    with pytest.raises(ValueError, match="cycle"):
+        run_stages([Stage("a", lambda b: b, deps=["b"]), Stage("b", lambda a: a, deps=["a"])], executor)
+    assert run_stages([], executor) == {}
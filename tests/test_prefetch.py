@@ -0,0 +1,149 @@
+# tests/test_prefetch.py
+
+import threading
+import time
+
+import pytest
+
+import gemini_client
+import prefetch
+import response_cache
+from prefetch import Prefetcher
+from response_cache import ResponseCache
+
+
+class Foreground:
+    """Stands in for the scheduler's is_busy()."""
+
+    def __init__(self):
+        self.busy = False
+
+    def __call__(self):
+        return self.busy
+
+
+@pytest.fixture
+def prompts_sent(monkeypatch, tmp_path):
+    sent = []
+    lock = threading.Lock()
+
+    def fake_query(prompt, use_cache=True, cancel_token=None):
+        with lock:
+            sent.append(prompt)
+        return "An answer."
+
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(response_cache, "_default_cache", cache)
+    monkeypatch.setattr(gemini_client, "query_gemini", fake_query)
+    monkeypatch.setattr(prefetch, "IDLE_POLL_SECONDS", 0.01)
+    yield sent
+    cache.close()
+
+
+@pytest.fixture
+def foreground():
+    return Foreground()
+
+
+@pytest.fixture
+def prefetcher(prompts_sent, foreground):
+    prefetcher = Prefetcher(foreground)
+    yield prefetcher
+    prefetcher.stop()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def markdown_file(tmp_path, name, text="# Notes\n\n- [ ] Write the tests\n"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path), text
+
+
+def test_a_prefetched_file_is_a_hit_when_opened_unchanged(tmp_path, prefetcher):
+    path, text = markdown_file(tmp_path, "notes.md")
+    prefetcher.seed([path])
+    wait_until(lambda: prefetcher.summary()["ready"] == 1)
+    assert prefetcher.claim(path, text)
+    stats = prefetcher.summary()
+    assert (stats["hits"], stats["misses"], stats["ready"]) == (1, 0, 0)
+
+
+def test_a_file_changed_since_prefetching_is_a_miss_and_wasted(tmp_path, prefetcher):
+    path, text = markdown_file(tmp_path, "notes.md")
+    prefetcher.seed([path])
+    wait_until(lambda: prefetcher.summary()["ready"] == 1)
+    assert not prefetcher.claim(path, text + "- [ ] One more\n")
+    stats = prefetcher.summary()
+    assert (stats["hits"], stats["misses"], stats["wasted_files"], stats["wasted_api_calls"]) == (0, 1, 1, 1)
+
+
+def test_touch_discards_the_stale_result_and_prefetches_again(tmp_path, prefetcher, prompts_sent):
+    path, _ = markdown_file(tmp_path, "notes.md")
+    prefetcher.seed([path])
+    wait_until(lambda: prefetcher.summary()["ready"] == 1)
+    _, text = markdown_file(tmp_path, "notes.md", "# Notes\n\n- [x] Write the tests\n")
+    prefetcher.touch(path)
+    wait_until(lambda: prefetcher.summary()["prefetched"] == 2)
+    assert prefetcher.summary()["wasted_files"] == 1
+    assert len(prompts_sent) == 2
+    assert prefetcher.claim(path, text)
+
+
+def test_clear_wastes_every_ready_result(tmp_path, prefetcher):
+    paths = [markdown_file(tmp_path, f"notes{i}.md", f"# Notes {i}\n")[0] for i in range(2)]
+    prefetcher.seed(paths)
+    wait_until(lambda: prefetcher.summary()["ready"] == 2)
+    prefetcher.clear()
+    stats = prefetcher.summary()
+    assert (stats["ready"], stats["queued"], stats["wasted_files"]) == (0, 0, 2)
+
+
+def test_nothing_is_prefetched_while_the_foreground_is_busy(tmp_path, prefetcher, foreground, prompts_sent):
+    foreground.busy = True
+    path, _ = markdown_file(tmp_path, "notes.md")
+    prefetcher.seed([path])
+    time.sleep(0.2)
+    assert prompts_sent == []
+    foreground.busy = False
+    wait_until(lambda: prefetcher.summary()["ready"] == 1)
+
+
+def test_foreground_work_started_between_steps_stops_the_next_one(tmp_path, monkeypatch, prefetcher,
+                                                                 foreground, prompts_sent):
+    read = prefetch.read_file_content
+
+    def read_then_get_busy(path):
+        foreground.busy = True  # The user opened a file while this one was being read.
+        return read(path)
+
+    monkeypatch.setattr(prefetch, "read_file_content", read_then_get_busy)
+    path, _ = markdown_file(tmp_path, "notes.md")
+    prefetcher.seed([path])
+    wait_until(lambda: foreground.busy)
+    time.sleep(0.2)
+    assert prompts_sent == []
+    assert prefetcher.summary()["queued"] == 1  # Retried once the foreground is idle.
+
+    monkeypatch.setattr(prefetch, "read_file_content", read)
+    foreground.busy = False
+    wait_until(lambda: prefetcher.summary()["ready"] == 1)
+    assert len(prompts_sent) == 1
+
+
+def test_the_hourly_api_budget_is_respected(tmp_path, prompts_sent, foreground):
+    prefetcher = Prefetcher(foreground, api_calls_per_hour=1)
+    try:
+        paths = [markdown_file(tmp_path, f"notes{i}.md", f"# Notes {i}\n")[0] for i in range(2)]
+        prefetcher.seed(paths)
+        wait_until(lambda: prefetcher.summary()["ready"] == 1)
+        time.sleep(0.2)
+        assert len(prompts_sent) == 1
+        assert prefetcher.summary()["queued"] == 1
+    finally:
+        prefetcher.stop()
@@ -0,0 +1,59 @@
+# tests/test_rate_limiter.py
+
+import asyncio
+import time
+
+import pytest
+
+from cancellation import Cancelled, CancelToken
+from rate_limiter import RateLimiter, TokenBucket
+
+
+def test_bucket_waits_for_refill():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    now = time.monotonic()
+    assert bucket.wait_time(2, now) == 0
+    bucket.take(2)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == 0
+
+
+def test_requests_larger_than_the_bucket_run_once_it_is_full():
+    bucket = TokenBucket(rate_per_minute=60, capacity=10)
+    now = time.monotonic()
+    assert bucket.wait_time(100, now) == 0
+    bucket.take(100)
+    assert bucket.wait_time(100, now) == pytest.approx(10.0)
+
+
+def test_reserve_limits_requests_and_tokens():
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1000)
+    assert limiter._reserve(10) == 0
+    assert limiter._reserve(10) == 0
+    assert limiter._reserve(10) > 0
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=100)
+    assert limiter._reserve(100) == 0
+    assert limiter._reserve(1) > 0
+
+
+def test_pause_holds_back_every_caller():
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1000)
+    limiter.pause(5)
+    assert limiter._reserve(0) == pytest.approx(5, abs=0.1)
+
+
+def test_acquire_is_cancellable():
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1000)
+    limiter.pause(60)
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(Cancelled):
+        limiter.acquire(cancel_token=token)
+
+
+def test_acquire_async_waits_without_blocking():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=10_000)
+    limiter.pause(0.05)
+    start = time.monotonic()
+    asyncio.run(limiter.acquire_async(1))
+    assert time.monotonic() - start >= 0.04
@@ -0,0 +1,123 @@
+# tests/test_response_cache.py
+
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, get_response_cache, make_cache_key, normalize_prompt, set_response_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = ResponseCache(str(tmp_path / f"cache{len(caches)}.sqlite3"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_normalize_prompt_ignores_line_endings_and_trailing_whitespace():
+    assert normalize_prompt("a  \r\nb\t\r\n\n") == "a\nb"
+    assert normalize_prompt("  a") == "a"
+    assert normalize_prompt("a\n  b") == "a\n  b"
+
+
+def test_cache_key_depends_on_model_endpoint_and_normalized_prompt():
+    key = make_cache_key("model", "generateContent", "prompt")
+    assert make_cache_key("model", "generateContent", "prompt  \r\n") == key
+    assert make_cache_key("other", "generateContent", "prompt") != key
+    assert make_cache_key("model", "streamGenerateContent", "prompt") != key
+    assert make_cache_key("model", "generateContent", "prompt 2") != key
+    # Parts are separated, so moving text between them changes the key.
+    assert make_cache_key("mo", "delgenerateContent", "prompt") != key
+
+
+def test_get_returns_what_put_stored(make_cache):
+    cache = make_cache()
+    assert cache.get("k") is None
+    cache.put("k", "answer — ✓")
+    assert cache.get("k") == "answer — ✓"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(path)
+    cache.put("k", "v")
+    cache.close()
+    cache = ResponseCache(path)
+    try:
+        assert cache.get("k") == "v"
+    finally:
+        cache.close()
+
+
+def test_expired_entries_are_misses(clock, make_cache):
+    cache = make_cache(max_age=60)
+    cache.put("k", "v")
+    clock.now += 61
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_beyond_the_size_limit(clock, make_cache):
+    cache = make_cache(max_bytes=10)
+    cache.put("a", "aaaa")
+    clock.now += 1
+    cache.put("b", "bbbb")
+    clock.now += 1
+    cache.get("a")  # "b" is now the least recently used.
+    clock.now += 1
+    cache.put("c", "cccc")
+    assert cache.get("a") == "aaaa"
+    assert cache.get("b") is None
+    assert cache.get("c") == "cccc"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_values_larger_than_the_cache_are_not_stored(make_cache):
+    cache = make_cache(max_bytes=4)
+    cache.put("k", "too long")
+    assert cache.get("k") is None
+
+
+def test_clear_removes_every_entry(make_cache):
+    cache = make_cache()
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+
+def test_a_disabled_shared_cache_is_none(monkeypatch):
+    monkeypatch.setattr(response_cache, "_default_cache", None)
+    set_response_cache(None)
+    assert get_response_cache() is None
+
+
+def test_an_installed_shared_cache_is_returned(monkeypatch, make_cache):
+    monkeypatch.setattr(response_cache, "_default_cache", None)
+    cache = make_cache()
+    set_response_cache(cache)
+    assert get_response_cache() is cache
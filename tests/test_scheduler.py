@@ -0,0 +1,94 @@
+# tests/test_scheduler.py
+
+import threading
+import time
+
+from cancellation import Cancelled, CancelToken
+from scheduler import AnalysisScheduler
+
+
+def recording_job(log, started=None):
+    def job(token, name):
+        if started:
+            started.set()
+        for _ in range(200):
+            if token.cancelled:
+                log.append(f"{name} cancelled")
+                raise Cancelled()
+            time.sleep(0.005)
+        log.append(f"{name} done")
+    return job
+
+
+def test_newer_submission_cancels_the_running_job_and_collapses_bursts():
+    scheduler, log, started = AnalysisScheduler(), [], threading.Event()
+    job = recording_job(log, started)
+    scheduler.submit("buffer", job, "v1")
+    started.wait(5)
+    for version in ("v2", "v3", "v4"):
+        scheduler.submit("buffer", job, version)
+    assert scheduler.wait_idle("buffer", timeout=10)
+    assert log == ["v1 cancelled", "v4 done"]
+    assert not scheduler.is_busy()
+
+
+def test_keys_run_independently():
+    scheduler, log = AnalysisScheduler(), []
+    job = recording_job(log)
+    scheduler.submit("a", job, "a")
+    scheduler.submit("b", job, "b")
+    assert scheduler.wait_idle("a", 10) and scheduler.wait_idle("b", 10)
+    assert sorted(log) == ["a done", "b done"]
+
+
+def test_cancel_others_keeps_the_listed_keys():
+    scheduler, log = AnalysisScheduler(), []
+    job = recording_job(log)
+    scheduler.submit("file a", job, "a")
+    scheduler.submit("question", job, "q")
+    time.sleep(0.05)
+    scheduler.cancel_others("file b", keep=("question",))
+    scheduler.submit("file b", job, "b")
+    for key in ("file a", "question", "file b"):
+        assert scheduler.wait_idle(key, 10)
+    assert sorted(log) == ["a cancelled", "b done", "q done"]
+
+
+def test_failing_job_does_not_wedge_its_key():
+    scheduler = AnalysisScheduler()
+
+    def fail(token):
+        raise ValueError("boom")
+
+    scheduler.submit("key", fail)
+    assert scheduler.wait_idle("key", 5)
+    done = threading.Event()
+    scheduler.submit("key", lambda token: done.set())
+    assert done.wait(5)
+
+
+def test_cancel_all_and_wait_idle_timeout():
+    scheduler, log = AnalysisScheduler(), []
+    scheduler.submit("key", recording_job(log), "x")
+    assert not scheduler.wait_idle("key", timeout=0.05)
+    scheduler.cancel_all()
+    assert scheduler.wait_idle("key", 5)
+    assert log == ["x cancelled"]
+
+
+def test_cancel_token_callbacks():
+    token, calls = CancelToken(), []
+    remove = token.add_callback(lambda: calls.append("first"))
+    token.add_callback(lambda: calls.append("second"))
+    remove()
+    token.cancel()
+    token.cancel()
+    assert calls == ["second"]
+    token.add_callback(lambda: calls.append("late"))  # Runs at once on a cancelled token.
+    assert calls == ["second", "late"]
+    try:
+        token.raise_if_cancelled()
+    except Cancelled:
+        pass
+    else:
+        raise AssertionError("raise_if_cancelled() did not raise")
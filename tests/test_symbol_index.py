@@ -0,0 +1,57 @@
+# tests/test_symbol_index.py
+
+import os
+
+from symbol_index import SymbolIndex, tokenize
+
+
+def write(folder, name, text):
+    path = os.path.join(folder, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def make_index(tmp_path):
+    root = str(tmp_path / "project")
+    write(root, "net.py", 'def parse_retry_after(value):\n    """Reads a Retry-After header."""\n    return float(value)\n')
+    write(root, "shapes.py", "class Circle:\n    def area(self):\n        return 3.14 * self.r ** 2\n")
+    write(root, "venv/lib/ignored.py", "def parse_retry_after():\n    pass\n")
+    index = SymbolIndex(root, index_path=str(tmp_path / "index.json"))
+    index.refresh()
+    return root, index
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("parse_retry_after RetryPolicy") == [
+        "parse_retry_after", "parse", "retry", "after", "retrypolicy", "retry", "policy"]
+
+
+def test_search_ranks_matching_definitions(tmp_path):
+    root, index = make_index(tmp_path)
+    hits = index.search("how is the retry header parsed?")
+    assert hits[0].chunk.name == "parse_retry_after"
+    assert all("venv" not in hit.chunk.path for hit in hits)
+    assert index.search("retry", exclude_paths=[os.path.join(root, "net.py")]) == []
+    assert index.search("the of and") == []
+
+
+def test_update_and_remove_files(tmp_path):
+    root, index = make_index(tmp_path)
+    path = write(root, "shapes.py", "class Square:\n    def area(self):\n        return self.side ** 2\n")
+    index.update_file(path)
+    assert index.lookup("circle") == []
+    assert [c.name for c in index.lookup("square")] == ["Square"]
+    index.remove_file(path)
+    assert index.lookup("square") == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    root, index = make_index(tmp_path)
+    index.save()
+    loaded = SymbolIndex(root, index_path=index.index_path)
+    assert loaded.load()
+    assert loaded.refresh() == 0  # Nothing changed since the save.
+    assert loaded.stats() == index.stats()
+    assert loaded.search("circle area")[0].chunk.path == os.path.join(root, "shapes.py")
@@ -0,0 +1,50 @@
+# tests/test_text_render.py
+
+import threading
+
+from text_render import EditorMirror, cap_text
+
+
+def mirror(text):
+    """An EditorMirror over `text` without a Tk widget; edits are applied through its bookkeeping."""
+    instance = EditorMirror.__new__(EditorMirror)
+    instance.lines = text.split("\n")
+    instance._dirty = []
+    instance._lock = threading.Lock()
+    return instance
+
+
+def test_cap_text_keeps_short_text_and_counts_hidden_lines():
+    assert cap_text("short\n", 100) == "short\n"
+    capped = cap_text("a\n" * 10, 7)
+    assert capped.startswith("a\na\na")
+    assert "7 more lines (14 characters) not shown" in capped
+    assert "1 more line (15 characters)" in cap_text("x" * 20, 5)
+
+
+def test_insert_and_delete_track_lines():
+    m = mirror("a\nb\nc\nd")
+    m._insert((2, 1), "X\nY")
+    assert m.lines == ["a", "bX", "Y", "c", "d"]
+    m._delete((4, 0), (5, 1))
+    assert m.lines == ["a", "bX", "Y", ""]
+    assert m.text() == "a\nbX\nY\n\n"
+
+
+def test_dirty_ranges_merge_and_shift():
+    m = mirror("\n".join(str(n) for n in range(1, 21)))
+    m._insert((15, 0), "x")
+    m._insert((2, 0), "new line\n")  # Shifts the earlier range down by one.
+    assert m.take_dirty() == [(2, 3), (16, 16)]
+    assert m.take_dirty() == []
+    m._insert((5, 0), "a")
+    m._insert((6, 0), "b")  # Adjacent ranges merge.
+    assert m.take_dirty() == [(5, 6)]
+
+
+def test_deleting_lines_shrinks_later_ranges():
+    m = mirror("\n".join(str(n) for n in range(1, 11)))
+    m._insert((9, 0), "x")
+    m._delete((2, 0), (5, 0))
+    assert m.lines[1] == "5"
+    assert m.take_dirty() == [(2, 2), (6, 6)]
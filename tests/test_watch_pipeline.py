@@ -0,0 +1,151 @@
+# tests/test_watch_pipeline.py
+
+import threading
+import time
+
+import pytest
+
+from watch_pipeline import EventPipeline, is_ignored
+
+
+class Recorder:
+    def __init__(self):
+        self.paths = []
+        self._cond = threading.Condition()
+
+    def __call__(self, path):
+        with self._cond:
+            self.paths.append(path)
+            self._cond.notify_all()
+
+    def wait_for(self, count, timeout=5):
+        with self._cond:
+            assert self._cond.wait_for(lambda: len(self.paths) >= count, timeout)
+        return list(self.paths)
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def make_pipeline(recorder):
+    pipelines = []
+
+    def make(**kwargs):
+        kwargs.setdefault("debounce", 0.05)
+        pipeline = EventPipeline(recorder, **kwargs)
+        pipelines.append(pipeline)
+        return pipeline
+
+    yield make
+    for pipeline in pipelines:
+        pipeline.stop()
+
+
+def settle(seconds=0.3):
+    time.sleep(seconds)
+
+
+def test_is_ignored_matches_any_path_component():
+    assert is_ignored("project/.git/config")
+    assert is_ignored("project/pkg.egg-info/PKG-INFO")
+    assert is_ignored("project/.module.py.swp")
+    assert not is_ignored("project/src/module.py")
+
+
+def test_wants_only_watched_extensions_below_the_root(tmp_path, make_pipeline):
+    pipeline = make_pipeline(root=str(tmp_path))
+    assert pipeline.wants(str(tmp_path / "a.py"))
+    assert pipeline.wants(str(tmp_path / "docs" / "notes.md"))
+    assert not pipeline.wants(str(tmp_path / "data.txt"))
+    assert not pipeline.wants(str(tmp_path / "venv" / "lib" / "site.py"))
+    assert not pipeline.wants(str(tmp_path.parent / "outside.py"))
+
+
+def test_globs_apply_below_the_root_only(tmp_path, make_pipeline):
+    root = tmp_path / "env" / "project"
+    pipeline = make_pipeline(root=str(root))
+    assert pipeline.wants(str(root / "a.py"))
+
+
+def test_a_burst_of_events_is_one_run(tmp_path, recorder, make_pipeline):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    pipeline = make_pipeline(root=str(tmp_path))
+    for _ in range(5):
+        pipeline.submit(str(path))
+    assert recorder.wait_for(1) == [str(path)]
+    settle()
+    assert recorder.paths == [str(path)]
+    assert pipeline.stats["coalesced"] == 4
+
+
+def test_events_in_different_files_are_all_processed(tmp_path, recorder, make_pipeline):
+    paths = [tmp_path / f"m{i}.py" for i in range(3)]
+    for i, path in enumerate(paths):
+        path.write_text(f"x = {i}\n")
+    pipeline = make_pipeline(root=str(tmp_path))
+    for path in paths:
+        pipeline.submit(str(path))
+    assert sorted(recorder.wait_for(3)) == sorted(str(path) for path in paths)
+
+
+def test_ignored_events_are_counted_and_dropped(tmp_path, recorder, make_pipeline):
+    pipeline = make_pipeline(root=str(tmp_path))
+    pipeline.submit(str(tmp_path / "__pycache__" / "a.py"))
+    pipeline.submit(str(tmp_path / "notes.txt"))
+    settle()
+    assert recorder.paths == []
+    assert pipeline.stats["ignored"] == 2
+
+
+def test_a_save_without_changes_is_not_analysed_again(tmp_path, recorder, make_pipeline):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    pipeline = make_pipeline(root=str(tmp_path))
+    pipeline.submit(str(path))
+    recorder.wait_for(1)
+    pipeline.submit(str(path))
+    settle()
+    assert len(recorder.paths) == 1
+    assert pipeline.stats["unchanged"] == 1
+
+    path.write_text("x = 2\n")
+    pipeline.submit(str(path))
+    assert len(recorder.wait_for(2)) == 2
+
+
+def test_a_forgotten_path_is_analysed_again(tmp_path, recorder, make_pipeline):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    pipeline = make_pipeline(root=str(tmp_path))
+    pipeline.submit(str(path))
+    recorder.wait_for(1)
+    pipeline.forget(str(path))
+    pipeline.submit(str(path))
+    assert len(recorder.wait_for(2)) == 2
+
+
+def test_a_failing_handler_does_not_stop_the_workers(tmp_path, make_pipeline):
+    good = tmp_path / "good.py"
+    bad = tmp_path / "bad.py"
+    good.write_text("x = 1\n")
+    bad.write_text("x = 2\n")
+    done = threading.Event()
+
+    def handler(path):
+        if path == str(bad):
+            raise RuntimeError("boom")
+        done.set()
+
+    pipeline = EventPipeline(handler, root=str(tmp_path), debounce=0.05, workers=1)
+    try:
+        pipeline.submit(str(bad))
+        settle()
+        pipeline.submit(str(good))
+        assert done.wait(5)
+        assert pipeline.stats["failed"] == 1
+    finally:
+        pipeline.stop()
@@ -0,0 +1,200 @@
+# text_render.py
+# This module keeps Tk text widgets responsive with large content: time-sliced inserts, capped
+# result tabs, and a line mirror of the editor that records which lines were edited.
+
+import threading
+import time
+
+import perf
+
+# Each slice inserts at most this many lines, then yields to the Tk event loop.
+CHUNK_LINES = 2000
+SLICE_BUDGET_MS = 12
+# Result tabs show at most this many characters; the rest is summarised in a note.
+MAX_RESULT_CHARS = 400_000
+
+
+def cap_text(content: str, limit: int = MAX_RESULT_CHARS) -> str:
+    """Cuts `content` to `limit` characters at a line break, with a note saying how much was left out."""
+    if len(content) <= limit:
+        return content
+    cut = content.rfind("\n", 0, limit)
+    cut = cut if cut > 0 else limit
+    hidden = content[cut:].lstrip("\n")
+    lines = hidden.count("\n") + (0 if hidden.endswith("\n") else 1)
+    return (content[:cut] + f"\n\n[... {lines} more line{'' if lines == 1 else 's'} "
+            f"({len(hidden)} characters) not shown ...]\n")
+
+
+class ChunkedRenderer:
+    """
+    Inserts text into Text widgets a slice at a time through `after()`, so the
+    main loop keeps handling input while megabytes are rendered. Text appended
+    to a widget that is still rendering is queued behind it, keeping the order.
+    Must be used from the Tk thread.
+    """
+
+    def __init__(self, root, chunk_lines=CHUNK_LINES, slice_budget_ms=SLICE_BUDGET_MS):
+        self.root = root
+        self.chunk_lines = chunk_lines
+        self.slice_budget = slice_budget_ms / 1000
+        self._pending = {}    # widget -> list of text still to insert
+        self._callbacks = {}  # widget -> callables to run when its render finishes
+
+    def is_rendering(self, widget) -> bool:
+        return widget in self._pending
+
+    def render(self, widget, content, on_done=None):
+        """Replaces the widget's content; a render already in progress is abandoned."""
+        widget.delete("1.0", "end")
+        self._callbacks[widget] = [on_done] if on_done else []
+        first = widget not in self._pending
+        self._pending[widget] = [content]
+        if first:
+            self._slice(widget)
+
+    def append(self, widget, text):
+        if widget in self._pending:
+            self._pending[widget].append(text)
+        else:
+            widget.insert("end", text)
+
+    def _slice(self, widget):
+        queue = self._pending.get(widget)
+        if queue is None:
+            return
+        deadline = time.perf_counter() + self.slice_budget
+        with perf.span("gui.render_slice") as attrs:
+            inserted = 0
+            while queue and time.perf_counter() < deadline:
+                text = queue[0]
+                cut = _nth_newline(text, self.chunk_lines)
+                if cut < 0 or cut + 1 >= len(text):
+                    queue.pop(0)
+                    chunk = text
+                else:
+                    chunk, queue[0] = text[:cut + 1], text[cut + 1:]
+                widget.insert("end", chunk)
+                inserted += len(chunk)
+            attrs["chars"] = inserted
+        if queue:
+            self.root.after(1, self._slice, widget)
+            return
+        del self._pending[widget]
+        for callback in self._callbacks.pop(widget, []):
+            callback()
+
+
+def _nth_newline(text, n):
+    index = -1
+    for _ in range(n):
+        index = text.find("\n", index + 1)
+        if index < 0:
+            return -1
+    return index
+
+
+class EditorMirror:
+    """
+    Keeps a Python copy of a Text widget's lines by intercepting the widget's Tcl
+    command, and records which line ranges were edited since they were last taken.
+    Reading the buffer then needs no Tk call, and code can be read from any thread.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.lines = [""]
+        self._dirty = []  # merged, sorted [start, end] line ranges (1-based, inclusive)
+        self._lock = threading.Lock()
+        self._original = widget._w + "_original"
+        widget.tk.call("rename", widget._w, self._original)
+        widget.tk.createcommand(widget._w, self._proxy)
+        self._resync()
+
+    def _call(self, *args):
+        return self.widget.tk.call((self._original,) + args)
+
+    def _position(self, index):
+        line, column = self._call("index", index).split(".")
+        return int(line), int(column)
+
+    def _clamped(self, index):
+        """Tk never edits past the final newline, so neither does the mirror."""
+        if self._call("compare", index, ">", "end-1c"):
+            index = "end-1c"
+        return self._position(index)
+
+    def _proxy(self, command, *args):
+        if command == "insert" and args:
+            position = self._clamped(args[0])
+            result = self._call(command, *args)
+            self._insert(position, "".join(args[1::2]))
+        elif command == "delete" and args and len(args) <= 2:
+            start = self._clamped(args[0])
+            end = self._clamped(args[1] if len(args) == 2 else f"{args[0]}+1c")
+            result = self._call(command, *args)
+            if start < end:
+                self._delete(start, end)
+        elif command in ("replace", "delete") or (command == "edit" and args and args[0] in ("undo", "redo")):
+            result = self._call(command, *args)
+            self._resync()
+        else:
+            result = self._call(command, *args)
+        return result
+
+    def _insert(self, position, text):
+        if not text:
+            return
+        line, column = position
+        with self._lock:
+            current = self.lines[line - 1]
+            new_lines = (current[:column] + text + current[column:]).split("\n")
+            self._splice(line, 1, new_lines)
+
+    def _delete(self, start, end):
+        (line1, column1), (line2, column2) = start, end
+        with self._lock:
+            merged = self.lines[line1 - 1][:column1] + self.lines[line2 - 1][column2:]
+            self._splice(line1, line2 - line1 + 1, [merged])
+
+    def _splice(self, line, count, new_lines):
+        """Replaces `count` lines starting at `line` and marks the result dirty (caller holds the lock)."""
+        self.lines[line - 1:line - 1 + count] = new_lines
+        delta = len(new_lines) - count
+        changed = [line, line + len(new_lines) - 1]
+        ranges = []
+        for start, end in self._dirty:
+            if end < line:
+                ranges.append([start, end])
+            elif start > line + count - 1:
+                ranges.append([start + delta, end + delta])
+            else:
+                changed = [min(changed[0], start), max(changed[1], end + delta)]
+        ranges.append(changed)
+        ranges.sort()
+        self._dirty = []
+        for start, end in ranges:
+            if self._dirty and start <= self._dirty[-1][1] + 1:
+                self._dirty[-1][1] = max(self._dirty[-1][1], end)
+            else:
+                self._dirty.append([start, end])
+
+    def _resync(self):
+        text = self._call("get", "1.0", "end-1c")
+        with self._lock:
+            self.lines = text.split("\n")
+            self._dirty = [[1, len(self.lines)]]
+
+    def text(self) -> str:
+        with self._lock:
+            return "\n".join(self.lines) + "\n"
+
+    def line_count(self) -> int:
+        with self._lock:
+            return len(self.lines)
+
+    def take_dirty(self) -> list:
+        """Returns the (start, end) line ranges edited since the last call, and forgets them."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, []
+        return [(start, min(end, len(self.lines))) for start, end in dirty]
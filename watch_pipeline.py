@@ -0,0 +1,160 @@
+# watch_pipeline.py
+# This module turns raw file-system events into a stable stream of analysis work.
+
+import fnmatch
+import hashlib
+import os
+import queue
+import threading
+import time
+
+DEFAULT_IGNORE_GLOBS = (".git", ".hg", ".svn", "venv", ".venv", "env", "__pycache__", "node_modules",
+                        ".tox", ".nox", ".mypy_cache", ".pytest_cache", "*.egg-info", "*.swp", "*~", ".#*")
+DEFAULT_EXTENSIONS = (".py", ".md")
+
+
+def is_ignored(path, ignore_globs=DEFAULT_IGNORE_GLOBS) -> bool:
+    """
+    True if the path or any of its components matches one of the globs.
+    """
+    normalized = path.replace("\\", "/")
+    parts = [part for part in normalized.split("/") if part]
+    return any(
+        fnmatch.fnmatch(normalized, pattern) or any(fnmatch.fnmatch(part, pattern) for part in parts)
+        for pattern in ignore_globs
+    )
+
+
+class EventPipeline:
+    """
+    Debounces file events per path, drops saves that did not change the file's
+    content, and hands the remaining paths to a fixed pool of workers through a
+    bounded queue.
+
+    Each path has its own quiet period: an editor that writes a file in several
+    steps produces one run, and saves in other files are never swallowed.
+    """
+
+    def __init__(self, handler, root=None, debounce=1.0, ignore_globs=DEFAULT_IGNORE_GLOBS,
+                 extensions=DEFAULT_EXTENSIONS, workers=2, max_queue=256):
+        self.handler = handler
+        self.root = root
+        self.debounce = debounce
+        self.ignore_globs = tuple(ignore_globs)
+        self.extensions = tuple(extensions)
+        self.stats = {"received": 0, "ignored": 0, "coalesced": 0, "unchanged": 0,
+                      "dropped": 0, "processed": 0, "failed": 0}
+        self._cond = threading.Condition()
+        self._deadlines = {}
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._queued = set()
+        self._hashes = {}
+        self._stopped = False
+        self._threads = [threading.Thread(target=self._timer_loop, name="watch-debounce", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._worker_loop, name=f"watch-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def wants(self, path) -> bool:
+        """True if an event for `path` would be analysed: a watched extension below the root, not ignored."""
+        if not path.endswith(self.extensions):
+            return False
+        if not self.root:
+            return not is_ignored(path, self.ignore_globs)
+        try:
+            relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+        except ValueError:
+            return False  # On another drive.
+        # Globs apply below the watched root, so a project inside e.g. ~/env/ still works.
+        return not relative.startswith("..") and not is_ignored(relative, self.ignore_globs)
+
+    def submit(self, path):
+        """Records an event for `path`; safe to call from the watchdog thread."""
+        with self._cond:
+            self.stats["received"] += 1
+            if not self.wants(path):
+                self.stats["ignored"] += 1
+                return
+            if path in self._deadlines:
+                self.stats["coalesced"] += 1
+            self._deadlines[path] = time.monotonic() + self.debounce
+            self._cond.notify()
+
+    def forget(self, path):
+        """Drops state for a deleted path so a re-created file is analysed again."""
+        with self._cond:
+            self._deadlines.pop(path, None)
+            self._hashes.pop(path, None)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._deadlines.clear()
+            self._cond.notify_all()
+        for _ in self._threads[1:]:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+
+    def _timer_loop(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = time.monotonic()
+                    due = [path for path, deadline in self._deadlines.items() if deadline <= now]
+                    if due:
+                        break
+                    timeout = min(self._deadlines.values()) - now if self._deadlines else None
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                for path in due:
+                    del self._deadlines[path]
+                # A path still waiting for a worker will read the newest content anyway.
+                waiting = [path for path in due if path in self._queued]
+                self.stats["coalesced"] += len(waiting)
+                due = [path for path in due if path not in self._queued]
+                self._queued.update(due)
+            for path in due:
+                try:
+                    self._queue.put_nowait(path)
+                except queue.Full:
+                    with self._cond:
+                        self._queued.discard(path)
+                        self.stats["dropped"] += 1
+
+    def _worker_loop(self):
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            with self._cond:
+                self._queued.discard(path)
+            digest = self._content_hash(path)
+            if digest is None:
+                continue
+            with self._cond:
+                if self._hashes.get(path) == digest:
+                    self.stats["unchanged"] += 1
+                    continue
+                self._hashes[path] = digest
+            try:
+                self.handler(path)
+                with self._cond:
+                    self.stats["processed"] += 1
+            except Exception as e:
+                print(f"Analysis of {path} failed: {e}")
+                with self._cond:
+                    self.stats["failed"] += 1
+
+    @staticmethod
+    def _content_hash(path):
+        try:
+            with open(path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None